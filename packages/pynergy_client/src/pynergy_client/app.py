@@ -2,7 +2,6 @@ import asyncio
 import json
 import platform
 import sys
-from dataclasses import fields, replace
 from pathlib import Path
 from typing import Annotated
 
@@ -16,7 +15,7 @@ from . import __version__
 from .client.client import PynergyClient
 from .client.dispatcher import MessageDispatcher
 from .client.handlers import PynergyHandler
-from .config import Available_Backends, Config, LogLevel
+from .config import VALID_FIELDS, Available_Backends, Config, LogLevel
 from .i18n import _
 from .utils import init_backend, init_logger
 
@@ -35,7 +34,7 @@ def main(
     ctx: typer.Context,
     config: Annotated[
         Path, typer.Option(help=_('Path to the configuration file'))
-    ] = user_config_path(appname='pynergy', ensure_exists=True) / 'client-config.json',
+    ] = user_config_path(appname='pynergy') / 'client-config.json',
     server: Annotated[
         str | None, typer.Option(help=_('Deskflow/Others server IP address'))
     ] = 'localhost',
@@ -62,6 +61,10 @@ def main(
         int | None,
         typer.Option(help=_('Sync frequency, sync with system real position every n moves')),
     ] = 2,
+    busy_poll: Annotated[
+        int | None,
+        typer.Option(help=_('Unit: µs, busy poll the socket to cut receive latency, 0 disables')),
+    ] = 0,
     logger_name: Annotated[str | None, typer.Option(help=_('Logger name'))] = 'Pynergy',
     log_dir: Annotated[str | None, typer.Option(help=_('Log directory location'))] = user_log_path(
         appname='pynergy', appauthor=False
@@ -87,34 +90,31 @@ def main(
     The priority is CLI > config_file > default
     """
 
-    # 1. Load the JSON configuration file
+    # 1. Load the JSON configuration file, a new or empty file is not parsed at all
+    json_dict = {}
     if not config.exists():
         config.parent.mkdir(parents=True, exist_ok=True)
         config.write_text('{}', encoding='utf-8')
-
-    try:
-        with open(config, 'r', encoding='utf-8') as f:
-            json_dict = json.load(f)
-    except json.JSONDecodeError:
-        json_dict = {}
-
-    # 2. Instantiate base configuration (filter invalid fields)
-    valid_fields = {f.name for f in fields(Config)}
-    filtered_json = {k: v for k, v in json_dict.items() if k in valid_fields}
-    cfg = Config(**filtered_json)
-
-    # 3. Collect the parameters passed in by the CLI (i.e. the non-non-none) part of locals())
-    # Exclude parameters that are not Config fields, such as config_file
-    cli_args = locals()
-    overrides = {}
-    for k in valid_fields:
-        if k in cli_args:
-            source = ctx.get_parameter_source(k)
-            if source != ParameterSource.DEFAULT:
-                overrides[k] = cli_args[k]
-
-    # Override config
-    cfg = replace(cfg, **overrides)
+    elif raw := config.read_bytes().strip():
+        try:
+            json_dict = json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+
+    # 2. Filter invalid fields out of the JSON configuration
+    filtered_json = {k: v for k, v in json_dict.items() if k in VALID_FIELDS}
+
+    # 3. Collect the parameters explicitly passed in by the CLI. They are taken from the click
+    # context, so a new option only needs its Config field. Parameters that are not Config
+    # fields, such as config, are left out
+    overrides = {
+        k: v
+        for k, v in ctx.params.items()
+        if k in VALID_FIELDS and ctx.get_parameter_source(k) != ParameterSource.DEFAULT
+    }
+
+    # Merge once (CLI > config_file > default) and build the config a single time
+    cfg = Config(**{**filtered_json, **overrides})
 
     # 4. Run app
     try:
@@ -128,7 +128,8 @@ async def run_app(cfg: Config):
     logger.info(f'Logger initialized: {cfg.log_dir}/{cfg.log_file}')
 
     device_ctx, mouse, keyboard = init_backend(cfg)
-    assert device_ctx and mouse and keyboard
+    if not (device_ctx and mouse and keyboard):
+        raise RuntimeError('Failed to initialize the device backend')
     if not cfg.screen_width or not cfg.screen_height:
         device_ctx.update_screen_info()
         logger.info(
@@ -144,11 +145,7 @@ async def run_app(cfg: Config):
         dispatcher=dispatcher,
     )
 
-    # 1. Start Worker
-    # It will run all the time, waiting for messages in the queue
-    worker_task = asyncio.create_task(dispatcher.worker(0))
-
-    # 2. Start Client listening
+    # 1. Start Client listening, messages are handled on this task as they are parsed
     client.listen_task = asyncio.create_task(client.run())
 
     try:
@@ -161,6 +158,5 @@ async def run_app(cfg: Config):
         logger.error(f'Client error: {e}')
         sys.exit(1)
     finally:
-        # 3. Stop all tasks
+        # 2. Stop all tasks
         await client.stop()
-        worker_task.cancel()
@@ -10,19 +10,29 @@ from typing import TYPE_CHECKING
 
 from loguru import logger
 from pynergy_protocol import (
+    DMouseMoveMsg,
+    DMouseRelMoveMsg,
     HelloBackMsg,
     HelloMsg,
+    MsgBase,
     MsgID,
     PynergyParser,
 )
 
 from .. import config
-from ..utils import setup_ssl_context, validate_cert
+from ..utils import setup_ssl_context, tune_socket, validate_cert
 from .protocols import ClientProtocol, ClientState, DispatcherProtocol
 
 if TYPE_CHECKING:
     from .dispatcher import MessageDispatcher
 
+# Read as much as the kernel has buffered in one call, a burst of input events
+# is then parsed and dispatched from a single read
+_READ_SIZE = 65536
+# Integer codes of the pointer moves folded before dispatch, compared per message
+_DMMV = DMouseMoveMsg.CODE_IDX
+_DMRM = DMouseRelMoveMsg.CODE_IDX
+
 
 class PynergyClient(ClientProtocol):
     """Deskflow client class
@@ -31,6 +41,17 @@ class PynergyClient(ClientProtocol):
     and injecting input events into the system.
     """
 
+    __slots__ = (
+        'cfg',
+        'state',
+        'listen_task',
+        'running',
+        'reader',
+        'writer',
+        'parser',
+        'dispatcher',
+    )
+
     def __init__(
         self,
         cfg: config.Config,
@@ -60,13 +81,19 @@ class PynergyClient(ClientProtocol):
         self.reader, self.writer = await asyncio.open_connection(
             self.cfg.server, self.cfg.port, ssl=context
         )
+        tune_socket(self.writer, self.cfg)
         await validate_cert(self.writer, self.cfg)
         # 2. Wait for server Hello (async read)
         logger.debug('Waiting for server Hello message...')
-        data = await asyncio.wait_for(self.reader.read(1024), timeout=10.0)
-        self.parser.feed(data)
-        msg: HelloMsg | None = self.parser.next_handshake_msg(MsgID.Hello)
-        assert msg, 'Did not receive server Hello message'
+        msg: HelloMsg | None = None
+        # TCP is a stream, the Hello packet may arrive split over several reads
+        async with asyncio.timeout(10.0):
+            while msg is None:
+                data = await self.reader.read(1024)
+                if not data:
+                    raise ConnectionError('Did not receive server Hello message')
+                self.parser.feed(data)
+                msg = self.parser.next_handshake_msg(MsgID.Hello)
         logger.debug(f'Server protocol: {msg.protocol_name} {msg.major}.{msg.minor}')
 
         # 3. Send HelloBack (async write)
@@ -88,18 +115,19 @@ class PynergyClient(ClientProtocol):
         self.running = True
 
         try:
-            assert self.reader, 'Reader not initialized'
+            if self.reader is None:
+                raise ConnectionError('Reader not initialized')
             while self.running:
+                # Drain first, messages may already be buffered behind the handshake
+                await self._dispatch_buffered()
+                # A handler may have stopped the client (CBYE, EBAD...), do not read again
+                if not self.running:
+                    break
                 # The read here is also non-blocking
-                data = await self.reader.read(4096)
+                data = await self.reader.read(_READ_SIZE)
                 if not data:
                     break
                 self.parser.feed(data)
-                while True:
-                    msg = self.parser.next_msg()
-                    if msg is None:
-                        break
-                    await self.dispatcher.enqueue(msg, self)
         except (ConnectionResetError, BrokenPipeError, asyncio.CancelledError) as e:
             logger.error(f'Connection lost: {e}')
         except Exception as e:
@@ -108,6 +136,35 @@ class PynergyClient(ClientProtocol):
         finally:
             await self.close()
 
+    async def _dispatch_buffered(self) -> None:
+        """Dispatch every complete buffered message, folding runs of pointer moves into one"""
+        pending: MsgBase | None = None
+        for msg in self.parser.parse_all():
+            # Handlers run inline, once one stops the client the rest of the batch is dropped
+            # instead of reaching devices that are about to be closed
+            if not self.running:
+                break
+            code = msg.CODE_IDX
+            if pending is not None:
+                if code == _DMMV and pending.CODE_IDX == _DMMV:
+                    # Only the latest absolute position matters
+                    pending = msg
+                    continue
+                if code == _DMRM and pending.CODE_IDX == _DMRM:
+                    pending = DMouseRelMoveMsg(pending.dx + msg.dx, pending.dy + msg.dy)
+                    continue
+                await self.dispatcher.dispatch(pending, self)
+                pending = None
+
+            if code == _DMMV or code == _DMRM:
+                pending = msg
+            else:
+                await self.dispatcher.dispatch(msg, self)
+
+        if pending is not None and self.running:
+            await self.dispatcher.dispatch(pending, self)
+        self.dispatcher.flush()
+
     async def send_message(self, data: bytes):
         """Callback method for handlers to send messages back"""
         if self.writer:
@@ -148,6 +205,11 @@ class PynergyClient(ClientProtocol):
             except ConnectionError:
                 pass
 
-        # If you want to kill the task immediately without waiting for read to return:
-        if self.listen_task and not self.listen_task.done():
+        # If you want to kill the task immediately without waiting for read to return.
+        # Handlers run on the listen task itself, it must not cancel itself on a clean close
+        if (
+            self.listen_task
+            and not self.listen_task.done()
+            and self.listen_task is not asyncio.current_task()
+        ):
             self.listen_task.cancel()
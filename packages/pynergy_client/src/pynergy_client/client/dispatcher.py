@@ -1,62 +1,97 @@
-import asyncio
-import inspect
 from typing import Any
 
 from loguru import logger
-from pynergy_protocol import MsgID
+from pynergy_protocol import MsgID, Registry
 
 from .handlers import PynergyHandler
-from .protocols import ClientProtocol, DispatcherProtocol, MessageTask
+from .protocols import ClientProtocol, ClientState, DispatcherProtocol, HandlerMethod
+
+# Input events, only injected while the client is ACTIVE (entered this screen).
+# DMMV is deliberately left out, absolute moves were never gated by the client state
+DEVICE_CODES = frozenset({
+    MsgID.DKDN,
+    MsgID.DKDL,
+    MsgID.DKRP,
+    MsgID.DKUP,
+    MsgID.DMDN,
+    MsgID.DMRM,
+    MsgID.DMUP,
+    MsgID.DMWM,
+    MsgID.DCLP,
+})
+# Messages whose handlers write to the virtual devices and need a SYN_REPORT afterwards
+SYN_CODES = DEVICE_CODES | {MsgID.DMMV, MsgID.CINN, MsgID.COUT}
+
+# The same sets as CODE_IDX integers for dispatch(), MsgID is a str Enum whose
+# __hash__ is a Python-level call on every set lookup
+_DEVICE_IDX = frozenset(Registry.MAPPING[code].CODE_IDX for code in DEVICE_CODES)
+_SYN_IDX = frozenset(Registry.MAPPING[code].CODE_IDX for code in SYN_CODES)
 
 
 class MessageDispatcher(DispatcherProtocol):
+    __slots__ = (
+        'handler',
+        '_handler_table',
+        'default_handler',
+        '_pending_syn',
+    )
+
     def __init__(self, handler: PynergyHandler):
         self.handler = handler
-        self.queue = asyncio.Queue(maxsize=100)
 
-        self._handler_map = self._build_handler_map()
-        self.default_handler = getattr(
-            self.handler, 'default_handler', self.handler.default_handler
-        )
+        self.default_handler = self.handler.default_handler
+        self._handler_table = self._build_handler_table()
+        self._pending_syn = False
 
-        self.last_move_time = 0
-        self.throttle_interval = 0.016  # Approximately 60fps sampling rate
-
-    def _build_handler_map(self) -> dict:
-        """Scan all methods in handler instance that start with on_"""
-        mapping = {}
-        for name, method in inspect.getmembers(self.handler, predicate=callable):
-            if name.startswith('on_'):
-                # Extract protocol code part, e.g. "on_hello" -> "hello"
-                msg_code = name[3:].upper()
-                if msg_code == 'HELLO':
-                    msg_code = 'Hello'
-                if msg_code == 'HELLOBACK':
-                    msg_code = 'HelloBack'
-                assert msg_code in MsgID.__members__, f'{msg_code} is not a valid message code'
-                mapping[msg_code] = method
+    def _build_handler_table(self) -> list[HandlerMethod]:
+        """
+        Collect the handler methods marked with @handles along the handler class MRO, into a
+        list indexed by MsgBase.CODE_IDX. Codes without a handler resolve to the default one
+        """
+        table: list[HandlerMethod] = [self.default_handler] * len(MsgID)
+        loaded: dict[MsgID, str] = {}
+        seen: set[str] = set()
+        for klass in type(self.handler).__mro__:
+            for name, attr in vars(klass).items():
+                # A subclass override shadows the base method, marked or not
+                if name in seen:
+                    continue
+                seen.add(name)
+                # staticmethod does not forward attributes of the wrapped function
+                msg_code = getattr(getattr(attr, '__func__', attr), '_handles', None)
+                if msg_code is None or msg_code in loaded:
+                    continue
+                table[Registry.MAPPING[msg_code].CODE_IDX] = getattr(self.handler, name)
+                loaded[msg_code] = name
 
         logger.opt(lazy=True).debug(
             '{log}',
-            log=lambda: (
-                f'{self.__class__} loaded {len(mapping)} handler functions: {list(mapping.keys())}'
-            ),
+            log=lambda: f'{self.__class__} loaded {len(loaded)} handler functions: {list(loaded)}',
         )
-        return mapping
-
-    async def enqueue(self, msg: Any, client: ClientProtocol):
-        handler = self._handler_map.get(msg.CODE, self.default_handler)
-        task = MessageTask(handler, msg, client)
-        await self.queue.put(task)
-
-    async def worker(self, worker_id):
-        """Consumer: Take tasks from queue and execute"""
-        while True:
-            task = await self.queue.get()
-            try:
-                # Execute Handler and pass client
-                await task.handler(task.msg, task.client)
-            except Exception as e:
-                print(f'Worker-{worker_id} Error: {e}')
-            finally:
-                self.queue.task_done()
+        return table
+
+    async def dispatch(self, msg: Any, client: ClientProtocol):
+        """
+        Run the handler of msg right away on the task that parsed it, no queue or worker
+        task sits between the socket read and the device write
+        """
+        idx = msg.CODE_IDX
+        try:
+            if idx in _DEVICE_IDX and client.state != ClientState.ACTIVE:
+                logger.warning('Ignored {}, current state: {}', msg, client.state)
+                return
+            # Execute Handler and pass client
+            await self._handler_table[idx](msg, client)
+        except Exception as e:
+            logger.error('Error handling {}: {}', msg, e)
+        if idx in _SYN_IDX:
+            # Every message is its own frame, even a failed handler's partial events, only
+            # the write() is shared by the batch
+            self.handler.mark()
+            self._pending_syn = True
+
+    def flush(self) -> None:
+        """Write the frames marked during the dispatched batch, one write() per device"""
+        if self._pending_syn:
+            self._pending_syn = False
+            self.handler.syn()
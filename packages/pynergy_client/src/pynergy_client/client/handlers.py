@@ -1,5 +1,4 @@
-import time
-from functools import wraps
+from time import monotonic_ns
 from typing import TYPE_CHECKING
 
 from loguru import logger
@@ -27,37 +26,46 @@ from pynergy_protocol import (
     DMouseWheelMsg,
     EIncompatibleMsg,
     MsgBase,
+    MsgID,
 )
 
-from ..keymaps import hid_to_ecode, synergy_to_hid
+from ..keymaps import hid_to_ecode
+from ..keymaps.synergy_map import SYNERGY_TO_HID
 from .protocols import ClientState
 
+# Synergy key/button id -> evdev code, the two keymaps composed once at import instead of
+# two lookups per event. Unknown ids map to 0, as hid_to_ecode(synergy_to_hid(id)) does
+_SYNERGY_TO_ECODE: dict[int, int] = {
+    code: hid_to_ecode(hid) for code, hid in SYNERGY_TO_HID.items()
+}
 
-def device_check(func):
-    @wraps(func)
-    async def wrapper(self, msg, client):
-        # 1. State check (here self refers to the caller, i.e., Handler or Client instance)
-        if client.state != ClientState.ACTIVE:
-            logger.opt(lazy=True).warning(
-                '{log}', log=lambda: f'Ignored message {msg}, current state: {client.state}'
-            )
-            return None
 
-        # 2. Execute core business logic
-        result = await func(self, msg, client)
+def handles(code: MsgID):
+    """Mark a PynergyHandler method as the handler of `code`, picked up by the dispatcher"""
 
-        # 3. Unified device synchronization
-        self.mouse.syn()
-        self.keyboard.syn()
+    def decorator(func):
+        func._handles = code
+        return func
 
-        return result
-
-    return wrapper
+    return decorator
 
 
 class PynergyHandler:
     """专门负责处理解析后的业务逻辑"""
 
+    __slots__ = (
+        'cfg',
+        'ctx',
+        'mouse',
+        'keyboard',
+        'last_mouse_time',
+        'interval',
+        'mouse_pos_sync_freq',
+        'move_count',
+        '_pending_pos',
+        '_move',
+    )
+
     def __init__(
         self,
         cfg: config.Config,
@@ -70,44 +78,61 @@ class PynergyHandler:
         self.mouse = mouse_device
         self.keyboard = keyboard_device
 
+        # Integer nanoseconds, monotonic_ns() allocates no float per mouse move
         self.last_mouse_time = 0
-        self.interval = (
-            cfg.mouse_move_threshold / 1000
-        )  # ~125Hz, can balance smoothness and performance
+        # ~125Hz, can balance smoothness and performance
+        self.interval = cfg.mouse_move_threshold * 1_000_000
         self.mouse_pos_sync_freq = cfg.mouse_pos_sync_freq
         self.move_count = 0
         self._pending_pos = None
+        # abs_mouse_move is fixed for the session, pick the move strategy once
+        self._move = mouse_device.move_absolute if cfg.abs_mouse_move else self._move_relative
+
+    def mark(self) -> None:
+        """End the frame of the message just handled, nothing is written yet"""
+        self.mouse.mark()
+        self.keyboard.mark()
+
+    def syn(self) -> None:
+        """Write the frames of the input handlers, one write() per device"""
+        self.mouse.syn()
+        self.keyboard.syn()
 
     @staticmethod
     async def default_handler(msg, client=None):
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Ignored message: {msg.CODE}')
+        logger.warning('Ignored message: {}', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.Hello)
     async def on_hello(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.HelloBack)
     async def on_helloback(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.CCLP)
     async def on_cclp(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.CBYE)
     async def on_cbye(msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).info('{log}', log=lambda: 'Received connection close message')
-        client.running = False
+        logger.debug('Handle {}', msg)
+        logger.info('Received connection close message')
+        # Only clearing client.running would leave run() blocked in read() until the
+        # next packet arrives, stop() closes the stream and wakes it up immediately
+        await client.stop()
 
+    @handles(MsgID.CINN)
     async def on_cinn(self, msg: CEnterMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).info(
-            '{log}', log=lambda: f'Entered screen at position: ({msg.entry_x}, {msg.entry_y})'
-        )
+        logger.debug('Handle {}', msg)
+        logger.info('Entered screen at position: ({}, {})', msg.entry_x, msg.entry_y)
         self.mouse.move_absolute(msg.entry_x, msg.entry_y)
         self.ctx.logical_pos = (msg.entry_x, msg.entry_y)
         client.state = ClientState.ACTIVE
@@ -116,152 +141,160 @@ class PynergyHandler:
         self.keyboard.sync_modifiers(modifiers)
 
     @staticmethod
+    @handles(MsgID.CIAK)
     async def on_ciak(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
 
     @staticmethod
+    @handles(MsgID.CALV)
     async def on_calv(msg: CKeepAliveMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).trace('{log}', log=lambda: f'Handle {msg}')
+        logger.trace('Handle {}', msg)
         await client.send_message(msg.pack_for_socket())
 
+    @handles(MsgID.COUT)
     async def on_cout(self, msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
         client.state = ClientState.CONNECTED
         self.keyboard.release_all_key()
         self.mouse.release_all_button()
 
     @staticmethod
+    @handles(MsgID.CNOP)
     async def on_cnop(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.CROP)
     async def on_crop(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.CSEC)
     async def on_csec(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
-    @device_check
+    @handles(MsgID.DKDN)
     async def on_dkdn(self, msg: DKeyDownMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        key_code = msg.key_button
-        self.keyboard.send_key(hid_to_ecode(synergy_to_hid(key_code)), True)
+        logger.debug('Handle {}', msg)
+        self.keyboard.send_key(_SYNERGY_TO_ECODE.get(msg.key_button, 0), True)
 
-    @device_check
+    @handles(MsgID.DKDL)
     async def on_dkdl(self, msg: DKeyDownLangMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        key_code = msg.key_button
-        self.keyboard.send_key(hid_to_ecode(synergy_to_hid(key_code)), True)
+        logger.debug('Handle {}', msg)
+        self.keyboard.send_key(_SYNERGY_TO_ECODE.get(msg.key_button, 0), True)
 
-    @device_check
+    @handles(MsgID.DKRP)
     async def on_dkrp(self, msg: DKeyRepeatMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
 
-        key_code = msg.key_button
+        # pressed_keys holds evdev codes, so translate before the lookup
+        key_code = _SYNERGY_TO_ECODE.get(msg.key_button, 0)
         if key_code not in self.keyboard.pressed_keys:
-            self.keyboard.send_key(hid_to_ecode(synergy_to_hid(key_code)), True)
+            self.keyboard.send_key(key_code, True)
 
-    @device_check
+    @handles(MsgID.DKUP)
     async def on_dkup(self, msg: DKeyUpMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        key_code = msg.key_button
-        self.keyboard.send_key(hid_to_ecode(synergy_to_hid(key_code)), False)
+        logger.debug('Handle {}', msg)
+        self.keyboard.send_key(_SYNERGY_TO_ECODE.get(msg.key_button, 0), False)
 
-    @device_check
+    @handles(MsgID.DMDN)
     async def on_dmdn(self, msg: DMouseDownMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        button = msg.button
-        self.mouse.send_button(hid_to_ecode(synergy_to_hid((button << 8) + 0xAA)), True)
+        logger.debug('Handle {}', msg)
+        # Buttons share the key table, encoded as (button << 8) | 0xAA
+        self.mouse.send_button(_SYNERGY_TO_ECODE.get((msg.button << 8) + 0xAA, 0), True)
 
-    # @device_check
+    @handles(MsgID.DMMV)
     async def on_dmmv(self, msg: DMouseMoveMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).trace('{log}', log=lambda: f'Handle {msg}')
-        now = time.perf_counter()
+        logger.trace('Handle {}', msg)
+        now = monotonic_ns()
 
         if now - self.last_mouse_time < self.interval:
             # Maybe mouse debounce needed? Send after moving certain distance
             # self._pending_pos = (msg.x, msg.y)
             return
 
-        if self.cfg.abs_mouse_move:
-            self.mouse.move_absolute(msg.x, msg.y)
-            self.mouse.syn()
-        else:
-            self.move_count += 1
-            if self.move_count >= self.mouse_pos_sync_freq:
-                self.mouse.move_absolute(msg.x, msg.y)
-                self.mouse.syn()
-                self.move_count = 0
-                return
-            dx, dy = self.ctx.calculate_relative_move(msg.x, msg.y)
-            if dx != 0 or dy != 0:
-                self.mouse.move_relative(dx, dy)
-                self.mouse.syn()
-
-    @device_check
+        self.last_mouse_time = now
+        self._move(msg.x, msg.y)
+
+    def _move_relative(self, x: int, y: int) -> None:
+        """Follow an absolute position with relative moves, resyncing every few moves"""
+        self.move_count += 1
+        if self.move_count >= self.mouse_pos_sync_freq:
+            self.mouse.move_absolute(x, y)
+            self.move_count = 0
+            return
+        dx, dy = self.ctx.calculate_relative_move(x, y)
+        if dx != 0 or dy != 0:
+            self.mouse.move_relative(dx, dy)
+
+    @handles(MsgID.DMRM)
     async def on_dmrm(self, msg: DMouseRelMoveMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).trace('{log}', log=lambda: f'Handle {msg}')
+        logger.trace('Handle {}', msg)
         self.mouse.move_relative(msg.dx, msg.dy)
 
-    @device_check
+    @handles(MsgID.DMUP)
     async def on_dmup(self, msg: DMouseUpMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        button = msg.button
-        self.mouse.send_button(hid_to_ecode(synergy_to_hid((button << 8) + 0xAA)), False)
+        logger.debug('Handle {}', msg)
+        # Buttons share the key table, encoded as (button << 8) | 0xAA
+        self.mouse.send_button(_SYNERGY_TO_ECODE.get((msg.button << 8) + 0xAA, 0), False)
 
-    @device_check
+    @handles(MsgID.DMWM)
     async def on_dmwm(self, msg: DMouseWheelMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).trace('{log}', log=lambda: f'Handle {msg}')
+        logger.trace('Handle {}', msg)
 
         x, y = msg.x_delta, msg.y_delta
-        if y != 0:
-            self.mouse.wheel_relative(1 if y > 0 else -1)
-        if x != 0:
-            self.mouse.wheel_relative(1 if x > 0 else -1)
+        # Both axes go out as one frame, horizontal deltas land on REL_HWHEEL
+        self.mouse.wheel_relative((y > 0) - (y < 0), (x > 0) - (x < 0))
 
-    @device_check
+    @handles(MsgID.DCLP)
     async def on_dclp(self, msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
 
     @staticmethod
+    @handles(MsgID.DINF)
     async def on_dinf(msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}, send CIAK')
+        logger.debug('Handle {}, send CIAK', msg)
         await client.send_message(CInfoAckMsg().pack_for_socket())
 
     @staticmethod
+    @handles(MsgID.DSOP)
     async def on_dsop(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.DDRG)
     async def on_ddrg(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.DFTR)
     async def on_dftr(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).warning('{log}', log=lambda: f'Handler {msg.CODE} is unimplement')
+        logger.debug('Handle {}', msg)
+        logger.warning('Handler {} is unimplement', msg.CODE)
 
     @staticmethod
+    @handles(MsgID.LSYN)
     async def on_lsyn(msg: DLanguageSynchronisationMsg, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
 
     @staticmethod
+    @handles(MsgID.SECN)
     async def on_secn(msg: MsgBase, client=None):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
 
+    @handles(MsgID.QINF)
     async def on_qinf(self, msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}, send DINF')
+        logger.debug('Handle {}, send DINF', msg)
         try:
             self.ctx.update_screen_info()
             self.ctx.sync_logical_to_real()
-        except Exception:
-            logger.opt(lazy=True).warning('{log}', log=lambda: f'Failed to get mouse position: {e}')
+        except Exception as e:
+            logger.warning('Failed to get mouse position: {}', e)
         dinf_msg = DInfoMsg(
             0,
             0,
@@ -271,28 +304,30 @@ class PynergyHandler:
             self.ctx.logical_pos[0],
             self.ctx.logical_pos[1],
         )
-        assert client.writer is not None
+        # send_message() already skips the write when the connection is gone
         await client.send_message(dinf_msg.pack_for_socket())
 
     @staticmethod
+    @handles(MsgID.EBAD)
     async def on_ebad(msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
         await client.stop()
 
     @staticmethod
+    @handles(MsgID.EBSY)
     async def on_ebsy(msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
         await client.stop()
 
     @staticmethod
+    @handles(MsgID.EICV)
     async def on_eicv(msg: EIncompatibleMsg, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
-        logger.opt(lazy=True).error(
-            '{log}', log=lambda: f'Version incompatible error: {msg.major}.{msg.minor}'
-        )
+        logger.debug('Handle {}', msg)
+        logger.error('Version incompatible error: {}.{}', msg.major, msg.minor)
         await client.stop()
 
     @staticmethod
+    @handles(MsgID.EUNK)
     async def on_eunk(msg: MsgBase, client: 'PynergyClient'):
-        logger.opt(lazy=True).debug('{log}', log=lambda: f'Handle {msg}')
+        logger.debug('Handle {}', msg)
         await client.stop()
@@ -1,5 +1,4 @@
 import asyncio
-from dataclasses import dataclass
 from enum import Enum
 from typing import TYPE_CHECKING, Protocol
 
@@ -21,6 +20,8 @@ class ClientState(Enum):
 
 
 class ClientProtocol(Protocol):
+    __slots__ = ()
+
     server: str
     port: int
     name: str
@@ -50,17 +51,11 @@ class HandlerMethod(Protocol):
     async def __call__(self, msg: MsgBase, client: ClientProtocol) -> None: ...
 
 
-@dataclass
-class MessageTask:
-    handler: HandlerMethod
-    msg: MsgBase
-    client: ClientProtocol  # Inject Client reference for easy callback
-
-
 class DispatcherProtocol(Protocol):
+    __slots__ = ()
+
     handler: 'PynergyHandler'
-    queue: asyncio.Queue[MessageTask]
 
-    async def enqueue(self, msg: MsgBase, client: ClientProtocol): ...
+    async def dispatch(self, msg: MsgBase, client: ClientProtocol): ...
 
-    async def worker(self, worker_id): ...
+    def flush(self) -> None: ...
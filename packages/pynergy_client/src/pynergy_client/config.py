@@ -2,7 +2,7 @@
 Global project configuration file.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Literal
 
@@ -17,7 +17,7 @@ Available_Backends = Literal[
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     server: str = 'localhost'
     port: int = 24800
@@ -34,6 +34,9 @@ class Config:
         2  # Sync frequency, sync actual mouse position with system every n moves
     )
 
+    # --- Network ---
+    busy_poll: int = 0  # Unit: µs, busy poll the socket for new data (Linux SO_BUSY_POLL), 0 = off
+
     tls: bool = False
     mtls: bool = False
     tls_trust: bool = False
@@ -55,3 +58,7 @@ class Config:
             if self.log_dir.startswith('~'):
                 self.log_dir = Path(self.log_dir).expanduser()
             self.log_dir = Path(self.log_dir)
+
+
+# Names accepted from the config file and the CLI, computed once at import
+VALID_FIELDS: frozenset[str] = frozenset(f.name for f in fields(Config))
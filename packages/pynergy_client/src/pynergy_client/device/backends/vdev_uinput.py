@@ -1,4 +1,8 @@
-from typing import Tuple
+import glob
+import os
+import struct
+from time import monotonic_ns
+from typing import Iterable, Tuple
 
 import evdev
 from evdev import AbsInfo
@@ -7,9 +11,88 @@ from loguru import logger
 from pynergy_protocol import ModifierKeyMask
 
 from pynergy_client.device.base import BaseKeyboardVirtualDevice, BaseMouseVirtualDevice
+from pynergy_client.keymaps.ecode_map import ECODE_TO_HID
+
+# struct input_event: timeval (sec, usec), type, code, value.
+# The kernel ignores the timestamp of events injected through uinput, so it is left as 0.
+_INPUT_EVENT = struct.Struct('llHHi')
+_XY_EVENTS = struct.Struct(_INPUT_EVENT.format * 2)
+
+# Event codes used per event, bound once instead of an ecodes lookup on every write
+_EV_KEY = e.EV_KEY
+_EV_REL = e.EV_REL
+_EV_ABS = e.EV_ABS
+_REL_X = e.REL_X
+_REL_Y = e.REL_Y
+_REL_WHEEL = e.REL_WHEEL
+_REL_HWHEEL = e.REL_HWHEEL
+_ABS_X = e.ABS_X
+_ABS_Y = e.ABS_Y
+_ABS_WHEEL = e.ABS_WHEEL
+# Terminates a frame, appended to the pending events so both go out in the same write()
+_SYN_REPORT = _INPUT_EVENT.pack(0, 0, e.EV_SYN, e.SYN_REPORT, 0)
+
+# Keys the virtual keyboard declares: every key code the keymaps can produce (mouse buttons
+# go to the mouse device) plus the lock keys sync_modifiers taps. Declaring only these
+# instead of range(1, 256) keeps the device's key bitmap small and its creation cheap
+_KEYBOARD_KEYS = sorted(
+    {code for code in ECODE_TO_HID if code < e.BTN_MISC}
+    | {e.KEY_CAPSLOCK, e.KEY_NUMLOCK, e.KEY_SCROLLLOCK}
+)
+
+# Lock 键映射 (Mask, Sysfs 名称, 按键 Ecode)，模块加载时构建一次
+_LOCK_KEYS = (
+    (ModifierKeyMask.CapsLock, 'capslock', e.KEY_CAPSLOCK),
+    (ModifierKeyMask.NumLock, 'numlock', e.KEY_NUMLOCK),
+    (ModifierKeyMask.ScrollLock, 'scrolllock', e.KEY_SCROLLLOCK),
+)
+# An unchanged mask within this window skips the LED reads. The toggles sent by the last
+# sync only reach the LEDs after the frame is flushed, reading them again this soon could
+# see the old state and toggle a second time
+_LED_RECHECK_NS = 50_000_000
+
+
+def _pack_events(events: Iterable[Tuple[int, int, int]]) -> bytes:
+    """Pack (type, code, value) events into consecutive struct input_event records"""
+    return b''.join([_INPUT_EVENT.pack(0, 0, type_, code, value) for type_, code, value in events])
+
+
+class _UInputFrameWriter:
+    """
+    Shared frame buffering of the uinput devices. Events written since the last syn() are
+    kept in `_pending`, mark() ends a frame there and syn() submits every ended frame with a
+    single write(). The device classes declare the slots
+    """
+
+    __slots__ = ()
+
+    _ui: evdev.UInput
+    _pending: bytearray
 
+    def mark(self) -> None:
+        # Readers apply the events of one frame as simultaneous, a click must not share
+        # the frame of the move before it. An empty or already ended frame needs no report
+        if self._pending and not self._pending.endswith(_SYN_REPORT):
+            self._pending += _SYN_REPORT
+
+    def syn(self) -> None:
+        self.mark()
+        # An empty report carries nothing for the reader, skip its write() syscall
+        if self._pending:
+            # Swapped out before writing, a failed write must not replay the frame later
+            frame, self._pending = self._pending, bytearray()
+            os.write(self._ui.fd, frame)
+
+    def close(self) -> None:
+        # Deliver what is still pending (e.g. the release_all_* events) before the
+        # device goes away
+        self.syn()
+        self._ui.close()
+
+
+class UInputMouseDevice(_UInputFrameWriter, BaseMouseVirtualDevice):
+    __slots__ = ('_ui', '_pending')
 
-class UInputMouseDevice(BaseMouseVirtualDevice):
     def __init__(
         self,
         name: str = 'Pynergy UInput vMouse',
@@ -58,45 +141,39 @@ class UInputMouseDevice(BaseMouseVirtualDevice):
             product=product,
             version=version,
         )
+        self._pending = bytearray()
 
     def move_absolute(self, x: int, y: int) -> None:
-        self._ui.write(e.EV_ABS, e.ABS_X, x)
-        self._ui.write(e.EV_ABS, e.ABS_Y, y)
+        self._pending += _XY_EVENTS.pack(0, 0, _EV_ABS, _ABS_X, x, 0, 0, _EV_ABS, _ABS_Y, y)
 
     def move_relative(self, dx: int, dy: int) -> None:
-        self._ui.write(e.EV_REL, e.REL_X, dx)
-        self._ui.write(e.EV_REL, e.REL_Y, dy)
+        self._pending += _XY_EVENTS.pack(0, 0, _EV_REL, _REL_X, dx, 0, 0, _EV_REL, _REL_Y, dy)
 
     def wheel_relative(self, dy: int = 0, dx: int = 0) -> None:
         if dy != 0:
-            self._ui.write(e.EV_REL, e.REL_WHEEL, dy)
+            self._pending += _INPUT_EVENT.pack(0, 0, _EV_REL, _REL_WHEEL, dy)
         if dx != 0:
-            self._ui.write(e.EV_REL, e.REL_HWHEEL, dx)
+            self._pending += _INPUT_EVENT.pack(0, 0, _EV_REL, _REL_HWHEEL, dx)
 
     def wheel_absolute(self, degree: int = 0) -> None:
-        self._ui.write(e.EV_ABS, e.ABS_WHEEL, degree)
+        self._pending += _INPUT_EVENT.pack(0, 0, _EV_ABS, _ABS_WHEEL, degree)
 
     def send_button(self, button_id: int, down: bool) -> None:
         if down:
             self.pressed_btns.add(button_id)
-            value = 1
         else:
             self.pressed_btns.discard(button_id)
-            value = 0
-        self._ui.write(e.EV_KEY, button_id, value)
+        # bool is an int, True/False go out as 1/0
+        self._pending += _INPUT_EVENT.pack(0, 0, _EV_KEY, button_id, down)
 
     def release_all_button(self) -> None:
-        for button_id in list(self.pressed_btns):
-            self.send_button(button_id, False)
+        self._pending += _pack_events([(_EV_KEY, button_id, 0) for button_id in self.pressed_btns])
+        self.pressed_btns.clear()
 
-    def syn(self) -> None:
-        self._ui.syn()
-
-    def close(self) -> None:
-        self._ui.close()
 
+class UInputKeyboardDevice(_UInputFrameWriter, BaseKeyboardVirtualDevice):
+    __slots__ = ('_ui', '_pending', '_last_led_check')
 
-class UInputKeyboardDevice(BaseKeyboardVirtualDevice):
     def __init__(
         self,
         name: str = 'Pynergy UInput vKeyboard',
@@ -114,7 +191,7 @@ class UInputKeyboardDevice(BaseKeyboardVirtualDevice):
         """
         super().__init__()
         capabilities = {
-            e.EV_KEY: range(1, 256),
+            e.EV_KEY: _KEYBOARD_KEYS,
             e.EV_LED: [e.LED_CAPSL, e.LED_NUML, e.LED_SCROLLL],  # 声明 LED 灯
         }
         self._ui = evdev.UInput(
@@ -124,32 +201,30 @@ class UInputKeyboardDevice(BaseKeyboardVirtualDevice):
             product=product,
             version=version,
         )
+        self._pending = bytearray()
+        self._last_led_check = 0
 
     def send_key(self, key_code: int, down: bool) -> None:
         if down:
             self.pressed_keys.add(key_code)
-            value = 1
         else:
             self.pressed_keys.discard(key_code)
-            value = 0
-
-        self._ui.write(e.EV_KEY, key_code, value)
+        # bool is an int, True/False go out as 1/0
+        self._pending += _INPUT_EVENT.pack(0, 0, _EV_KEY, key_code, down)
 
     def release_all_key(self) -> None:
-        for key_code in list(self.pressed_keys):
-            self.send_key(key_code, False)
+        self._pending += _pack_events([(_EV_KEY, key_code, 0) for key_code in self.pressed_keys])
+        self.pressed_keys.clear()
 
     def sync_modifiers(self, modifiers: int) -> None:
         """同步修饰键状态，使用 sysfs 规避 uinput 阻塞问题"""
+        now = monotonic_ns()
+        if modifiers == self.current_modifiers and now - self._last_led_check < _LED_RECHECK_NS:
+            return
+        self._last_led_check = now
 
-        # 1. 定义 Lock 键映射 (Mask, Sysfs 名称, 按键 Ecode)
-        lock_keys = [
-            (ModifierKeyMask.CapsLock, 'capslock', e.KEY_CAPSLOCK),
-            (ModifierKeyMask.NumLock, 'numlock', e.KEY_NUMLOCK),
-            (ModifierKeyMask.ScrollLock, 'scrolllock', e.KEY_SCROLLLOCK),
-        ]
-
-        for mask, sysfs_name, key_code in lock_keys:
+        # 1. 对比 Lock 键状态
+        for mask, sysfs_name, key_code in _LOCK_KEYS:
             target_state = bool(modifiers & mask)
             # 通过 sysfs 获取物理 / 系统真实的锁定状态
             local_state = get_led_state_sysfs(sysfs_name)
@@ -195,11 +270,32 @@ class UInputKeyboardDevice(BaseKeyboardVirtualDevice):
         # 3. 更新当前记录的状态
         self.current_modifiers = modifiers
 
-    def syn(self) -> None:
-        self._ui.syn()
-
     def close(self) -> None:
-        self._ui.close()
+        super().close()
+        # The cached LED fds outlive syncs but not the device, a new keyboard opens them again
+        for led_name in list(_LED_FDS):
+            _close_led_fds(led_name)
+
+
+# led_name -> open fds of the matching brightness files. Globbed and opened once, sysfs
+# regenerates the value on every read from offset 0, so the fds stay valid across syncs
+_LED_FDS: dict[str, list[int]] = {}
+
+
+def _open_led_fds(led_name: str) -> list[int]:
+    fds = []
+    # 匹配所有注册为 capslock 的 LED
+    for path in glob.glob(f'/sys/class/leds/*::{led_name}/brightness'):
+        try:
+            fds.append(os.open(path, os.O_RDONLY))
+        except OSError as e:
+            logger.warning('Error opening LED state: {}', e)
+    return fds
+
+
+def _close_led_fds(led_name: str) -> None:
+    for fd in _LED_FDS.pop(led_name, ()):
+        os.close(fd)
 
 
 def get_led_state_sysfs(led_name: str) -> bool:
@@ -207,19 +303,20 @@ def get_led_state_sysfs(led_name: str) -> bool:
     led_name 可能是: 'input3::capslock' 或 '*::capslock'
     NixOS 下路径通常在 /sys/class/leds/
     """
-    import glob
-
-    # 匹配所有注册为 capslock 的 LED
-    paths = glob.glob(f'/sys/class/leds/*::{led_name}/brightness')
-    for path in paths:
+    fds = _LED_FDS.get(led_name)
+    if not fds:
+        # 没找到时不缓存，键盘可能稍后才接入
+        fds = _open_led_fds(led_name)
+        if fds:
+            _LED_FDS[led_name] = fds
+    for fd in fds:
         try:
-            with open(path, 'r') as f:
-                if f.read().strip() != '0':
-                    return True
-        except Exception as e:
-            err_str = str(e)
-            logger.opt(lazy=True).warning(
-                '{log}', log=lambda: f'Error reading LED state: {err_str}'
-            )
-            continue
+            # One pread() per LED, no open/close or seek around it
+            if os.pread(fd, 16, 0).strip() != b'0':
+                return True
+        except OSError as e:
+            logger.warning('Error reading LED state: {}', e)
+            # The LED went away (e.g. keyboard unplugged), open the paths again next time
+            _close_led_fds(led_name)
+            return False
     return False
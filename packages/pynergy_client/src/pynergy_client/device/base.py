@@ -17,6 +17,8 @@ class PlatformInfo:
 
 
 class BaseDeviceContext(ABC):
+    __slots__ = ('platform_info', 'logical_pos', 'screen_size', 'scale')
+
     def __init__(self):
         self.platform_info: PlatformInfo = PlatformInfo()
         self.logical_pos: Tuple[int, int] = (0, 0)
@@ -89,6 +91,13 @@ class BaseDeviceContext(ABC):
 
 
 class BaseVirtualDevice(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def mark(self) -> None:
+        """End the current frame of events, it is submitted with the next syn()"""
+        pass
+
     @abstractmethod
     def syn(self) -> None:
         """Synchronize events"""
@@ -109,6 +118,8 @@ class BaseVirtualDevice(ABC):
 
 
 class BaseMouseVirtualDevice(BaseVirtualDevice):
+    __slots__ = ('pressed_btns',)
+
     def __init__(self):
         self.pressed_btns: set[int] = set()
 
@@ -144,6 +155,8 @@ class BaseMouseVirtualDevice(BaseVirtualDevice):
 
 
 class BaseKeyboardVirtualDevice(BaseVirtualDevice):
+    __slots__ = ('pressed_keys', 'current_modifiers')
+
     def __init__(self):
         self.pressed_keys: set[int] = set()
         self.current_modifiers: int = 0
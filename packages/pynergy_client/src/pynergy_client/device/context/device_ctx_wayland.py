@@ -8,6 +8,8 @@ from pynergy_client.device.base import BaseDeviceContext
 
 
 class WaylandDeviceContext(BaseDeviceContext):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -11,6 +11,17 @@ from evdev import ecodes
 
 from ..keymaps.ecode_map import ECODE_TO_HID
 
+# 设备能力在导入时计算一次，创建设备时只需复制
+_REL_CODES = [ecodes.REL_X, ecodes.REL_Y, ecodes.REL_WHEEL, ecodes.REL_HWHEEL]
+_KEY_CODES = [
+    ecodes.BTN_LEFT,
+    ecodes.BTN_RIGHT,
+    ecodes.BTN_MIDDLE,
+    ecodes.BTN_SIDE,
+    ecodes.BTN_EXTRA,
+    *ECODE_TO_HID.keys(),
+]
+
 
 class VirtualDevice:
     """虚拟输入设备类
@@ -51,12 +62,7 @@ class VirtualDevice:
             事件能力字典
         """
         capabilities: dict[int, list[int]] = {
-            ecodes.EV_REL: [
-                ecodes.REL_X,
-                ecodes.REL_Y,
-                ecodes.REL_WHEEL,
-                ecodes.REL_HWHEEL,
-            ],
+            ecodes.EV_REL: list(_REL_CODES),
             ecodes.EV_KEY: self._get_key_codes(),
         }
         return capabilities
@@ -70,16 +76,7 @@ class VirtualDevice:
         Returns:
             按键代码列表
         """
-        key_codes = [
-            ecodes.BTN_LEFT,
-            ecodes.BTN_RIGHT,
-            ecodes.BTN_MIDDLE,
-            ecodes.BTN_SIDE,
-            ecodes.BTN_EXTRA,
-        ]
-        for ecode in ECODE_TO_HID.keys():
-            key_codes.append(ecode)
-        return key_codes
+        return list(_KEY_CODES)
 
     def write_mouse_move(self, dx: int, dy: int) -> None:
         """写入鼠标移动事件
@@ -1,6 +1,7 @@
 import datetime
 import hashlib
 import json
+import socket
 import ssl
 import sys
 from pathlib import Path
@@ -26,6 +27,9 @@ from .device import (
 )
 from .device.base import PlatformInfo
 
+# Linux only, not exported by the socket module
+_SO_BUSY_POLL = getattr(socket, 'SO_BUSY_POLL', 46)
+
 
 def init_logger(cfg: config.Config):
     """
@@ -246,6 +250,28 @@ def setup_ssl_context(cfg: config.Config) -> ssl.SSLContext | None:
     return context
 
 
+def tune_socket(writer, cfg: config.Config):
+    """Apply latency related options to the server socket, failures are only logged"""
+    sock = writer.get_extra_info('socket')
+    if sock is None:
+        return
+
+    # Input events are a few bytes each, never hold them back waiting for an ACK
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if hasattr(socket, 'TCP_QUICKACK'):
+        # Not sticky, the kernel may fall back to delayed ACKs later on
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    # Let the kernel notice a peer that vanished without a FIN while the session is idle
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    if cfg.busy_poll > 0 and sys.platform == 'linux':
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, _SO_BUSY_POLL, cfg.busy_poll)
+        except OSError as e:
+            # Raising it above net.core.busy_poll requires CAP_NET_ADMIN
+            logger.warning('Failed to enable SO_BUSY_POLL: {}', e)
+
+
 async def validate_cert(writer, cfg: config.Config):
     if not cfg.tls and not cfg.mtls:
         return
@@ -56,6 +56,7 @@ from .struct_types import (
     UInt32,
     UInt64,
     ULInt32,
+    VarBytes,
     VarString,
     XPad,
 )
@@ -119,6 +120,7 @@ _struct_types = [
     UInt32,
     UInt64,
     ULInt32,
+    VarBytes,
     VarString,
     XPad,
 ]
@@ -184,6 +186,7 @@ __all__ = [
     'UInt32',
     'UInt64',
     'ULInt32',
+    'VarBytes',
     'VarString',
     'XPad',
 ]
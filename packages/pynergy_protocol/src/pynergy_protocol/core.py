@@ -1,8 +1,12 @@
 import struct
-from dataclasses import dataclass, fields
-from types import NoneType
+import sys
+from dataclasses import dataclass
+from operator import attrgetter
+from types import MappingProxyType, NoneType
 from typing import (
     Annotated,
+    Any,
+    Callable,
     ClassVar,
     Literal,
     Self,
@@ -17,10 +21,45 @@ from loguru import logger
 
 from .protocol_types import MsgID
 
-OpCode: TypeAlias = Literal['FIX_VAL', 'FIX_STR', 'VAR_STR']
-InstructionType: TypeAlias = list[tuple[OpCode, int, str]]
+OpCode: TypeAlias = Literal['FIX_VAL', 'FIX_STR', 'VAR_STR', 'VAR_BYTES']
+# (operation, size, struct format, compiled big-endian struct)
+InstructionType: TypeAlias = list[tuple[OpCode, int, str, struct.Struct]]
+# Consecutive fixed-size fields share one Struct:
+# (kind, compiled struct, number of fields, indexes of fixed strings within the group)
+GroupKind: TypeAlias = Literal['FIXED', 'VAR', 'VAR_BYTES']
+GroupType: TypeAlias = list[tuple[GroupKind, struct.Struct, int, tuple[int, ...]]]
 T = TypeVar('T', bound='MsgBase')
 
+# MsgID member -> its definition order, see MsgBase.CODE_IDX
+_CODE_INDEX: dict[MsgID, int] = {code: i for i, code in enumerate(MsgID)}
+
+# Big-endian uint32, used for length prefixes
+_U32 = struct.Struct('>I')
+# Socket bytes of messages without fields, which never change once built
+_CONST_PACKETS: dict[type, bytes] = {}
+# Compiled groups and generated codecs by layout, many messages share one (e.g. DKDN/DKUP)
+# key: ((op, struct format) per field, indexes of interned fields)
+_LAYOUT_CACHE: dict[tuple, tuple[GroupType, Callable, Callable]] = {}
+
+
+def _insufficient(i: int, kind: GroupKind, size: int, offset: int, length: int) -> str:
+    return (
+        f'Insufficient data: Out of range at group {i} ({kind}), '
+        f'need {size} bytes at offset {offset}, got {length - offset}.'
+    )
+
+
+def _incomplete(length: int, available: int) -> str:
+    return (
+        f'Variable length string data is incomplete: '
+        f'declared length={length}, available data={available}'
+    )
+
+
+def _uninitialized(data: memoryview) -> tuple[tuple, int]:
+    # Codec of MsgBase itself, only subclasses get a compiled layout
+    raise ValueError('Instruction set not initialized')
+
 
 @dataclass(slots=True)
 class MsgBase[T]:
@@ -28,20 +67,48 @@ class MsgBase[T]:
 
     _INSTRUCTIONS: ClassVar[InstructionType | NoneType] = None
     _FORMAT: ClassVar[str] = ''
+    _GROUPS: ClassVar[GroupType] = []
+    _FIELD_NAMES: ClassVar[tuple[str, ...]] = ()
+    # Indexes of all string fields (fixed and variable), encoded before packing
+    _STR_FIELDS: ClassVar[tuple[int, ...]] = ()
+    # String fields whose decoded values repeat across messages and are interned,
+    # so every message shares one str object instead of allocating a new one
+    _INTERN_STR_FIELDS: ClassVar[frozenset[str]] = frozenset()
+    # Straight-line codecs generated per class by _compile_codecs:
+    # data -> (field values, bytes consumed) and (code, encoded values) -> message bytes
+    _UNPACK_FIELDS: ClassVar[Callable[[memoryview], tuple[tuple, int]]] = staticmethod(
+        _uninitialized
+    )
+    _PACK_FIELDS: ClassVar[Callable[[bytes, tuple], bytearray]] = staticmethod(
+        lambda code, values: bytearray(code)
+    )
+    # Returns the values of all data fields as a tuple, in definition order
+    _GET_VALUES: ClassVar[Callable[[Any], tuple]] = staticmethod(lambda _: ())
     CODE: ClassVar[str] = ''
+    # Position of CODE in MsgID, lets consumers index plain lists instead of hashing the code
+    CODE_IDX: ClassVar[int] = -1
+    _CODE_BYTES: ClassVar[bytes] = b''
 
     def __init_subclass__(cls: T, **kwargs):
         # Prevent dataclass(slots=True) from repeatedly executing when rebuilding a class
         if '_format_initialized' in cls.__dict__:
             return
         # --- compile format ---
-        hints = get_type_hints(cls, include_extras=True)
+        # Own annotations are already evaluated Annotated objects, reading them skips the MRO
+        # walk of get_type_hints. String annotations and inherited fields still resolve through it
+        hints = cls.__annotations__
+        if cls.__base__ is not MsgBase or any(isinstance(h, str) for h in hints.values()):
+            hints = get_type_hints(cls, include_extras=True)
 
         fmt_parts: list[str] = ['>']
         instructions: InstructionType = []
+        field_names: list[str] = []
         for field_name, hint in hints.items():
             if field_name.startswith('_') or field_name == 'CODE':
                 continue
+            # Class-level constants such as CODE_IDX are not part of the wire format
+            if hint is ClassVar or get_origin(hint) is ClassVar:
+                continue
 
             if get_origin(hint) is Annotated:
                 metadata = get_args(hint)
@@ -50,17 +117,19 @@ class MsgBase[T]:
                 # Determine the type of operation
                 op: OpCode
                 if struct_char == 'Is':
-                    op = 'VAR_STR'
-                    size = 4  # Size of the length prefix only
+                    # Same wire format for both, bytes fields skip the UTF-8 decode/encode
+                    op = 'VAR_BYTES' if metadata[0] is bytes else 'VAR_STR'
+                    packer = _U32  # Only the length prefix has a fixed layout
                 elif 's' in struct_char:
                     op = 'FIX_STR'
-                    size = struct.calcsize(struct_char)
+                    packer = struct.Struct(f'>{struct_char}')
                 else:
                     op = 'FIX_VAL'
-                    size = struct.calcsize(struct_char)
+                    packer = struct.Struct(f'>{struct_char}')
 
                 fmt_parts.append(struct_char)
-                instructions.append((op, size, struct_char))
+                instructions.append((op, packer.size, struct_char, packer))
+                field_names.append(field_name)
 
             else:
                 raise TypeError(
@@ -70,82 +139,171 @@ class MsgBase[T]:
 
         setattr(cls, '_FORMAT', ''.join(fmt_parts))
         setattr(cls, '_INSTRUCTIONS', instructions)
+        layout = (
+            tuple((op, fmt) for op, _, fmt, _ in instructions),
+            tuple(i for i, name in enumerate(field_names) if name in cls._INTERN_STR_FIELDS),
+        )
+        compiled = _LAYOUT_CACHE.get(layout)
+        if compiled is None:
+            groups = cls._compile_groups(instructions)
+            compiled = _LAYOUT_CACHE[layout] = (
+                groups,
+                *cls._compile_codecs(groups, tuple(field_names)),
+            )
+        groups, unpack_fields, pack_fields = compiled
+        setattr(cls, '_GROUPS', groups)
+        setattr(cls, '_FIELD_NAMES', tuple(field_names))
+        setattr(
+            cls,
+            '_STR_FIELDS',
+            tuple(i for i, (op, *_) in enumerate(instructions) if op in ('FIX_STR', 'VAR_STR')),
+        )
+        setattr(cls, '_UNPACK_FIELDS', staticmethod(unpack_fields))
+        setattr(cls, '_PACK_FIELDS', staticmethod(pack_fields))
+        if len(field_names) > 1:
+            setattr(cls, '_GET_VALUES', staticmethod(attrgetter(*field_names)))
+        elif field_names:
+            # attrgetter with a single name returns the bare value, not a tuple
+            getter = attrgetter(field_names[0])
+            setattr(cls, '_GET_VALUES', staticmethod(lambda obj: (getter(obj),)))
         setattr(cls, '_format_initialized', True)
 
+    @staticmethod
+    def _compile_groups(instructions: InstructionType) -> GroupType:
+        """Merge runs of fixed-size instructions into a single big-endian Struct"""
+        groups: GroupType = []
+        run: InstructionType = []
+
+        def flush():
+            if run:
+                packer = struct.Struct('>' + ''.join(fmt for _, _, fmt, _ in run))
+                str_idx = tuple(j for j, (op, *_) in enumerate(run) if op == 'FIX_STR')
+                groups.append(('FIXED', packer, len(run), str_idx))
+                run.clear()
+
+        for instruction in instructions:
+            if instruction[0] == 'VAR_STR':
+                flush()
+                groups.append(('VAR', _U32, 1, ()))
+            elif instruction[0] == 'VAR_BYTES':
+                flush()
+                groups.append(('VAR_BYTES', _U32, 1, ()))
+            else:
+                run.append(instruction)
+        flush()
+        return groups
+
+    @classmethod
+    def _compile_codecs(
+        cls, groups: GroupType, field_names: tuple[str, ...]
+    ) -> tuple[Callable, Callable]:
+        """
+        Generate unrolled unpack/pack functions for one message layout, the same way
+        dataclasses generates __init__: offsets, structs and field counts become literals,
+        so the hot path runs without a loop or per-group dispatch.
+        Offsets are constants up to the first variable string and relative to `o` after it.
+        """
+        namespace: dict[str, Any] = {
+            '_U32': _U32,
+            '_insufficient': _insufficient,
+            '_incomplete': _incomplete,
+            '_intern': sys.intern,
+        }
+        names = [f'v{k}' for k in range(sum(count for _, _, count, _ in groups))]
+        values = ''.join(f'{name}, ' for name in names)
+
+        # --- unpack: data -> (values, bytes consumed) ---
+        lines = ['def unpack_fields(data):', '    n = len(data)']
+        relative, const, pos = False, 0, 0
+
+        def at(c: int) -> str:
+            return (f'o + {c}' if c else 'o') if relative else str(c)
+
+        def decoded(k: int, expr: str) -> str:
+            return f'_intern({expr})' if field_names[k] in cls._INTERN_STR_FIELDS else expr
+
+        for i, (kind, packer, count, str_idx) in enumerate(groups):
+            namespace[f'_S{i}'] = packer
+            lines += [
+                f'    if {at(const + packer.size)} > n:',
+                f'        raise ValueError('
+                f'_insufficient({i}, {kind!r}, {packer.size}, {at(const)}, n))',
+            ]
+            targets = ''.join(f'{name}, ' for name in names[pos : pos + count])
+            if kind == 'FIXED':
+                lines.append(f'    {targets}= _S{i}.unpack_from(data, {at(const)})')
+                # Fixed-length strings are decoded and stripped
+                for j in str_idx:
+                    expr = decoded(pos + j, f"v{pos + j}.decode().rstrip('\\x00')")
+                    lines.append(f'    v{pos + j} = {expr}')
+                const += packer.size
+            else:
+                # Variable string: 4 bytes of length, then the content decoded from the buffer.
+                # Raw bytes are copied out, the buffer behind `data` is reused after parsing
+                if kind == 'VAR':
+                    value = decoded(pos, "str(data[o : o + ln], 'utf-8')")
+                else:
+                    value = 'bytes(data[o : o + ln])'
+                lines += [
+                    f'    ln = _S{i}.unpack_from(data, {at(const)})[0]',
+                    f'    o = {at(const + packer.size)}',
+                    '    if o + ln > n:',
+                    '        raise ValueError(_incomplete(ln, n - o))',
+                    f'    v{pos} = {value}',
+                    '    o += ln',
+                ]
+                relative, const = True, 0
+            pos += count
+        lines.append(f'    return ({values}), {at(const)}')
+
+        # --- pack: (code, encoded values) -> message bytes ---
+        sizes = [str(sum(packer.size for _, packer, _, _ in groups))]
+        pos = 0
+        for kind, _, count, _ in groups:
+            if kind != 'FIXED':
+                sizes.append(f'len(v{pos})')
+            pos += count
+        lines += ['def pack_fields(code, values):']
+        if names:
+            lines.append(f'    {values}= values')
+        lines += [
+            f'    buf = bytearray(len(code) + {" + ".join(sizes)})',
+            '    o = len(code)',
+            '    buf[:o] = code',
+        ]
+        relative, const, pos = True, 0, 0
+        for i, (kind, packer, count, _) in enumerate(groups):
+            if kind == 'FIXED':
+                # Fixed-length strings arrive encoded, struct pads or truncates them
+                # with \x00 based on the format (e.g. "7s")
+                targets = ', '.join(names[pos : pos + count])
+                lines.append(f'    _S{i}.pack_into(buf, {at(const)}, {targets})')
+                const += packer.size
+            else:
+                # Handling Variable Strings (Synergy Style: Length + Data)
+                lines += [
+                    f'    _S{i}.pack_into(buf, {at(const)}, len(v{pos}))',
+                    f'    o = {at(const + packer.size)}',
+                    f'    buf[o : o + len(v{pos})] = v{pos}',
+                    f'    o += len(v{pos})',
+                ]
+                const = 0
+            pos += count
+        lines.append('    return buf')
+
+        exec('\n'.join(lines), namespace)
+        return namespace['unpack_fields'], namespace['pack_fields']
+
     @classmethod
     def unpack(cls, data: bytes) -> Self:
         try:
-            logger.opt(lazy=True).trace(
-                '{log}', log=lambda: f'Unpacking {cls.__name__}: data length={len(data)} bytes'
-            )
-            data = cls.before_unpack(data)
-            offset = 0
-            args = []
-
-            if cls._INSTRUCTIONS is None:
-                raise ValueError(f'Instruction set not initialized: {cls.__name__}')
-
-            for i, (op, size, fmt) in enumerate(cls._INSTRUCTIONS):
-                if offset >= len(data):
-                    raise ValueError(f'Insufficient data: Out of range at directive {i} ({op}).')
-
-                try:
-                    if op == 'FIX_VAL':
-                        # Unpack the value directly
-                        val = struct.unpack_from(f'>{fmt}', data, offset)[0]
-                        args.append(val)
-                        offset += size
-                        logger.opt(lazy=True).trace(
-                            '{log}',
-                            log=lambda: (
-                                f'Unpack fixed values: format={fmt}, value={val}, new offset={offset}'
-                            ),
-                        )
-
-                    elif op == 'FIX_STR':
-                        # Unwrap fixed-length strings and strip
-                        raw_val = struct.unpack_from(f'>{fmt}', data, offset)[0]
-                        val = raw_val.decode().rstrip('\x00')
-                        args.append(val)
-                        offset += size
-                        logger.opt(lazy=True).trace(
-                            '{log}',
-                            log=lambda: (
-                                f'Unpack fixed string: format={fmt}, value={val}, new offset={offset}'
-                            ),
-                        )
-
-                    elif op == 'VAR_STR':
-                        # Unpack a lengthened string: Read 4 bytes of length first
-                        if offset + 4 > len(data):
-                            raise ValueError('The length of the variable string is incomplete')
-
-                        length = struct.unpack_from('>I', data, offset)[0]
-                        offset += size
-
-                        if offset + length > len(data):
-                            raise ValueError(
-                                f'Variable length string data is incomplete: '
-                                f'declared length={length}, available data={len(data) - offset}'
-                            )
-
-                        val = data[offset : offset + length].decode()
-                        args.append(val)
-                        offset += length
-                        logger.opt(lazy=True).debug(
-                            '{log}',
-                            log=lambda: (
-                                f'Unpack Lengthy String: '
-                                f'length={length}, value={val}, new offset={offset}'
-                            ),
-                        )
-
-                except UnicodeDecodeError as e:
-                    raise ValueError(f'UTF-8 decoding fails in directive {i} ({op}): {e}') from e
-                except struct.error as e:
-                    raise ValueError(
-                        f'Struct unpacking fails in directive {i} ({op}), format={fmt}: {e}'
-                    ) from e
+            # No per-field logging in the loop, this is on the path of every message
+            logger.trace('Unpacking {}: data length={} bytes', cls.__name__, len(data))
+            # A memoryview lets the hooks and string fields slice without copying
+            data = cls.before_unpack(memoryview(data))
+
+            # Bounds are checked inside, struct and the decoder only fail on bad content
+            args, offset = cls._UNPACK_FIELDS(data)
 
             if offset < len(data):
                 logger.opt(lazy=True).warning(
@@ -157,16 +315,16 @@ class MsgBase[T]:
 
             result = cls(*args)  # type: ignore[call-arg]
             result = cls.after_unpack(result)
-            logger.opt(lazy=True).trace(
-                '{log}', log=lambda: f'Successful unpacking {cls.__name__}: {result}'
-            )
+            logger.trace('Successful unpacking {}: {}', cls.__name__, result)
             return result
 
-        except Exception:
-            logger.opt(lazy=True).error(
-                '{log}',
-                log=lambda: f'Unpacking {cls.__name__} failed: {e}',
-            )
+        # Errors are translated once here instead of around every field.
+        # UnicodeDecodeError is already a ValueError and bubbles up as is
+        except struct.error as e:
+            logger.error('Unpacking {} failed: {}', cls.__name__, e)
+            raise ValueError(f'Struct unpacking fails, format={cls._FORMAT}: {e}') from e
+        except Exception as e:
+            logger.error('Unpacking {} failed: {}', cls.__name__, e)
             raise
 
     def pack(self) -> bytes:
@@ -174,125 +332,55 @@ class MsgBase[T]:
         Dynamically Pack based on the order of fields defined by the class and _INSTRUCTIONS
         """
         try:
-            logger.opt(lazy=True).trace('{log}', log=lambda: f'Start packing {self}')
+            logger.trace('Start packing {}', self)
             self.before_pack()
-            result = bytearray()
-
-            code_bytes = struct.pack(f'>{len(self.CODE)}s', self.CODE.encode('utf-8'))
-            result.extend(code_bytes)
-            logger.opt(lazy=True).trace(
-                '{log}', log=lambda: f'Pack message code: {self.CODE}, length={len(code_bytes)}'
-            )
+            code = self._CODE_BYTES
 
-            # Get the values of all fields defined by the dataclass (in order of definition)
-            data_fields = [
-                f for f in fields(self) if not f.name.startswith('_') and f.name != 'CODE'
-            ]
+            # Values of all data fields in definition order, fetched in one C call
+            values = self._GET_VALUES(self)
 
-            if self._INSTRUCTIONS is None:
-                raise ValueError('Instruction list undefined')
-
-            if len(data_fields) != len(self._INSTRUCTIONS):
-                raise ValueError(
-                    f'The number of fields ({len(data_fields)}) does not match '
-                    f'the number of instructions ({len(self._INSTRUCTIONS)}).'
-                )
+            # Strings are encoded up front so the exact size is known
+            if self._STR_FIELDS:
+                values = list(values)
+                for pos in self._STR_FIELDS:
+                    values[pos] = values[pos].encode('utf-8')
 
-            # Process the instructions and field values one by one
-            for i, ((op, size, fmt), field_def) in enumerate(zip(self._INSTRUCTIONS, data_fields)):
-                try:
-                    val = getattr(self, field_def.name)
-                    logger.opt(lazy=True).trace(
-                        '{log}',
-                        log=lambda: (
-                            f'Process field {field_def.name}: value={val}, operation={op}, format={fmt}'
-                        ),
-                    )
-
-                    if op == 'FIX_VAL':
-                        # Processing values (I, H, B, etc.)
-                        packed_val = struct.pack(f'>{fmt}', val)
-                        result.extend(packed_val)
-                        logger.opt(lazy=True).trace(
-                            '{log}', log=lambda: f'Packing fixed value: {val} -> {packed_val.hex()}'
-                        )
-
-                    elif op == 'FIX_STR':
-                        # Handle fixed-length strings, ensuring they are encoded as
-                        # bytes and pfilled/truncated
-                        try:
-                            s_bytes = val.encode('utf-8')
-                            # struct.pack automatically handles truncation and
-                            # completion \x00 based on FMT (e.g. "7s").
-                            packed_str = struct.pack(f'>{fmt}', s_bytes)
-                            result.extend(packed_str)
-                            logger.opt(lazy=True).trace(
-                                '{log}',
-                                log=lambda: f"打包固定字符串: '{val}' -> {packed_str.hex()}",
-                            )
-                        except UnicodeEncodeError as e:
-                            raise ValueError(f'编码字符串字段 {field_def.name} 失败: {e}') from e
-
-                    elif op == 'VAR_STR':
-                        # Handling Variable Strings (Synergy Style: Length + Data)
-                        try:
-                            s_bytes = val.encode('utf-8')
-                            length = len(s_bytes)
-                            # Punch in 4 bytes before punching in the actual content
-                            length_bytes = struct.pack('>I', length)
-                            result.extend(length_bytes)
-                            result.extend(s_bytes)
-                            logger.trace(
-                                '{log}',
-                                log=lambda: (
-                                    f'Packing Long String: {val} '
-                                    f'(length={length}) -> {length_bytes.hex()}{s_bytes.hex()}'
-                                ),
-                            )
-                        except UnicodeEncodeError as e:
-                            raise ValueError(
-                                f'Encoding a variable string field {field_def.name} fails: {e}'
-                            ) from e
-
-                except struct.error as e:
-                    raise ValueError(
-                        f'Packing field {field_def.name} (directive {i}) '
-                        f'failed with format={fmt}: {e}'
-                    ) from e
-                except Exception:
-                    logger.opt(lazy=True).error(
-                        '{log}',
-                        log=lambda: f'Error with packaging field {field_def.name}: {e}',
-                    )
-                    raise
+            # The whole message is allocated once and filled in place
+            result = self._PACK_FIELDS(code, values)
 
             final_result = bytes(result)
             final_result = self.after_pack(final_result)
-            logger.opt(lazy=True).trace(
-                '{log}',
-                log=lambda: (
-                    f'Successfully packed {self.__class__.__name__}: '
-                    f'total length={len(final_result)} bytes'
-                ),
+            logger.trace(
+                'Successfully packed {}: total length={} bytes',
+                self.__class__.__name__,
+                len(final_result),
             )
             return final_result
 
-        except Exception:
-            logger.opt(lazy=True).error(
-                '{log}',
-                log=lambda: f'Pack {self.__class__.__name__} failed: {e}',
-            )
+        # UnicodeEncodeError is already a ValueError and bubbles up as is
+        except struct.error as e:
+            logger.error('Pack {} failed: {}', self.__class__.__name__, e)
+            raise ValueError(f'Packing failed with format={self._FORMAT}: {e}') from e
+        except Exception as e:
+            logger.error('Pack {} failed: {}', self.__class__.__name__, e)
             raise
 
     def pack_for_socket(self) -> bytes:
         """
         Append a 4-byte length prefix (Big-endian) before the message body
         """
+        if not self._INSTRUCTIONS:
+            packet = _CONST_PACKETS.get(type(self))
+            if packet is None:
+                payload = self.pack()
+                packet = _CONST_PACKETS[type(self)] = _U32.pack(len(payload)) + payload
+            return packet
+
         payload = self.pack()
-        return struct.pack('>I', len(payload)) + payload
+        return _U32.pack(len(payload)) + payload
 
     @staticmethod
-    def before_unpack(data: bytes) -> bytes:
+    def before_unpack(data: memoryview) -> memoryview:
         """Execute before unpacking"""
         return data[4:]
 
@@ -313,6 +401,10 @@ class MsgBase[T]:
 
 class Registry:
     _MAPPING: dict[MsgID, type['MsgBase']] = {}
+    # 4-byte codes as big-endian integers, ints hash cheaper than fresh bytes objects
+    _INT_MAPPING: dict[int, type['MsgBase']] = {}
+    # Read-only view of the registered types, only register() may change the table
+    MAPPING = MappingProxyType(_MAPPING)
 
     @classmethod
     def register(cls, msg_code: MsgID):
@@ -330,8 +422,13 @@ class Registry:
                     ),
                 )
 
+            code_bytes = msg_code.encode('utf-8')
             cls._MAPPING[msg_code] = subclass
+            if len(code_bytes) == 4:
+                cls._INT_MAPPING[int.from_bytes(code_bytes)] = subclass
             subclass.CODE = msg_code
+            subclass.CODE_IDX = _CODE_INDEX[msg_code]
+            subclass._CODE_BYTES = code_bytes
             logger.opt(lazy=True).trace(
                 '{log}', log=lambda: f'Registration message type: {msg_code} -> {subclass.__name__}'
             )
@@ -341,14 +438,14 @@ class Registry:
 
     @classmethod
     def get_class(cls, msg_code: MsgID) -> type[MsgBase]:
-        if msg_code not in cls._MAPPING:
-            logger.opt(lazy=True).warning('{log}', log=lambda: f'Message Not Found: {msg_code}')
-            raise KeyError(f'Unregistered message type: {msg_code}')
+        # A single lookup, the miss is handled on the exceptional path only
+        try:
+            result = cls._MAPPING[msg_code]
+        except KeyError:
+            logger.warning('Message Not Found: {}', msg_code)
+            raise KeyError(f'Unregistered message type: {msg_code}') from None
 
-        result = cls._MAPPING[msg_code]
-        logger.opt(lazy=True).trace(
-            '{log}', log=lambda: f'Get message class: {msg_code} -> {result.__name__}'
-        )
+        logger.trace('Get message class: {} -> {}', msg_code, result.__name__)
         return result
 
     @classmethod
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import ClassVar
 
 from .core import MsgBase, Registry
 from .protocol_types import MsgID
@@ -9,6 +10,7 @@ from .struct_types import (
     UInt8,
     UInt16,
     UInt32,
+    VarBytes,
     VarString,
 )
 
@@ -40,7 +42,7 @@ class HelloMsg(MsgBase):
     minor: UInt16
 
     @staticmethod
-    def before_unpack(data: bytes) -> bytes:
+    def before_unpack(data: memoryview) -> memoryview:
         return data
 
     @staticmethod
@@ -65,7 +67,7 @@ class HelloBackMsg(MsgBase):
     name: VarString
 
     @staticmethod
-    def before_unpack(data: bytes) -> bytes:
+    def before_unpack(data: memoryview) -> memoryview:
         return data
 
     @staticmethod
@@ -264,6 +266,9 @@ class DKeyDownLangMsg(MsgBase):
     key_button: UInt16
     language_code: VarString
 
+    # The same few layout codes arrive with every key press
+    _INTERN_STR_FIELDS: ClassVar[frozenset[str]] = frozenset({'language_code'})
+
 
 @Registry.register(MsgID.DKRP)
 @dataclass(slots=True)
@@ -294,6 +299,9 @@ class DKeyRepeatMsg(MsgBase):
     key_button: UInt16
     language_code: VarString
 
+    # The same few layout codes arrive with every key press
+    _INTERN_STR_FIELDS: ClassVar[frozenset[str]] = frozenset({'language_code'})
+
 
 @Registry.register(MsgID.DKUP)
 @dataclass(slots=True)
@@ -433,7 +441,8 @@ class DClipboardMsg(MsgBase):
         identifier: Clipboard identifier (1 byte)
         sequence: Sequence number (4 bytes)
         flag: Mark/flags (1 byte) - For streaming support (v1.6+)
-        data: Clipboard data (string)
+        data: Clipboard data (bytes) - Kept raw, it may be large and is not always text.
+        Use data_str for the UTF-8 decoded form
 
     Examples:
         Primary clipboard, sequence 1, no flags, text "Hello World"
@@ -443,7 +452,12 @@ class DClipboardMsg(MsgBase):
     identifier: UInt8
     sequence: UInt32
     flag: UInt8
-    data: VarString
+    data: VarBytes
+
+    @property
+    def data_str(self) -> str:
+        """data decoded as UTF-8, raises UnicodeDecodeError on binary payloads"""
+        return self.data.decode('utf-8')
 
 
 @Registry.register(MsgID.DINF)
@@ -1,4 +1,5 @@
 import struct
+from collections.abc import Buffer
 from typing import Literal
 
 from loguru import logger
@@ -6,111 +7,159 @@ from loguru import logger
 from .core import MsgBase, Registry
 from .protocol_types import MsgID
 
+# Compiled once instead of re-parsing the format string for every packet
+_LEN = struct.Struct('>I')
+# The message code is read as a big-endian integer too, the key of Registry._INT_MAPPING
+_CODE = _LEN
+# Protocol security check: Prevent malicious oversized packets from causing OOM
+_MAX_PACKET_SIZE = 10 * 1024 * 1024  # Assume max packet size is 10MB
+
 
 class PynergyParser[T: MsgBase]:
     def __init__(self):
         self._buffer = bytearray()
+        # Start of the unparsed data, consumed packets stay in the buffer until the next feed
+        self._read_pos = 0
+        # Code -> message class, a bound dict.get skips the Registry method call per packet
+        self._resolve = Registry._INT_MAPPING.get
 
-    def feed(self, data: bytes):
-        """Store received raw bytes"""
+    def feed(self, data: Buffer):
+        """Store received raw bytes, any bytes-like object is copied straight into the buffer"""
         if not data:
             return
-        logger.opt(lazy=True).trace('{log}', log=lambda: f'Fed {len(data)} bytes into buffer')
+        # Positional arguments are only formatted when TRACE is enabled, without the lambda
+        # that lazy=True needs, these calls sit on the path of every read and packet
+        logger.trace('Fed {} bytes into buffer', len(data))
+        # Drop everything parsed since the last feed in one go instead of once per packet
+        if self._read_pos:
+            del self._buffer[: self._read_pos]
+            self._read_pos = 0
         self._buffer.extend(data)
 
-    def _parse_packet(self, get_class_func):
+    def _parse_packet(self, msg_type: MsgID | None = None):
         """
         Private helper method: Core logic for parsing packets.
-        :param get_class_func: Function to get message class (for distinguishing next_msg and next_handshake_msg)
+        :param msg_type: Expected handshake message type, None to resolve the class from the
+            code at the start of the packet (for distinguishing next_msg and next_handshake_msg)
         :return: Parsed message object or None
         """
-        total_packet_size = 0
+        pos = self._read_pos
 
         # Basic length check (first 4 bytes are packet length)
-        if len(self._buffer) < 4:
+        if len(self._buffer) - pos < 4:
             return None
 
-        try:
-            # 1. Read length prefix
-            length = struct.unpack_from('>I', self._buffer)[0]
-
-            # Protocol security check: Prevent malicious oversized packets from causing OOM
-            if length > 10 * 1024 * 1024:  # Assume max packet size is 10MB
-                logger.opt(lazy=True).error(
-                    '{log}', log=lambda: f'Invalid packet length: {length}, clearing buffer'
-                )
-                self._buffer.clear()
-                return None
+        # 1. Read length prefix
+        length = _LEN.unpack_from(self._buffer, pos)[0]
 
-            # Check if buffer has enough data
-            total_packet_size = 4 + length
-            if len(self._buffer) < total_packet_size:
-                logger.opt(lazy=True).trace(
-                    '{log}',
-                    log=lambda: f'Wait for more data: {len(self._buffer)}/{total_packet_size}',
-                )
-                return None
+        # Protocol security check: Prevent malicious oversized packets from causing OOM
+        if length > _MAX_PACKET_SIZE:
+            logger.opt(lazy=True).error(
+                '{log}', log=lambda: f'Invalid packet length: {length}, clearing buffer'
+            )
+            self._buffer.clear()
+            self._read_pos = 0
+            return None
 
-            # 2. Extract packet (skip first 4 bytes of length)
-            packet = self._buffer[4:total_packet_size]
-
-            try:
-                # 3. Call passed function to get message class
-                cls = get_class_func(packet)
-
-                if not cls:
-                    logger.opt(lazy=True).warning(
-                        '{log}',
-                        log=lambda: (
-                            f'Unknown message code: {packet[:4].decode()}, size: {length}. Skipping.'
-                        ),
-                    )
-                    return None
-
-                # 4. Perform deserialization
-                msg_obj = cls.unpack(packet)
-                logger.opt(lazy=True).trace(
-                    '{log}', log=lambda: f'Successfully parsed message: {msg_obj}'
-                )
-                return msg_obj
-
-            except (struct.error, UnicodeDecodeError, ValueError):
-                logger.opt(lazy=True).error(
-                    '{log}',
-                    log=lambda: f'Failed to unpack message body (CODE: {packet[:4].decode()}): {e}',
-                )
-                return None
+        # Check if buffer has enough data
+        total_packet_size = 4 + length
+        if len(self._buffer) - pos < total_packet_size:
+            logger.trace('Wait for more data: {}/{}', len(self._buffer) - pos, total_packet_size)
+            return None
+
+        # Core principle: Regardless of parsing success, consume this data as long as length is
+        # sufficient. _unpack_packet handles its own errors, so no try/finally is needed
+        end = pos + total_packet_size
+        self._read_pos = end
+
+        # 2. Extract packet (skip first 4 bytes of length) as a view, the body is not copied.
+        # Both views are released on leaving the block, the buffer cannot be resized while
+        # a view is alive
+        with memoryview(self._buffer) as view, view[pos + 4 : end] as packet:
+            return self._unpack_packet(packet, msg_type)
 
-            except Exception:
-                logger.opt(lazy=True).exception(
-                    '{log}', log=lambda: f'Unexpected error during message construction: {e}'
-                )
+    def _unpack_packet(self, packet: memoryview, msg_type: MsgID | None = None):
+        """
+        Build the message object from one complete packet (without the length prefix).
+        :return: Parsed message object or None if the packet is unknown or broken
+        """
+        # 3. Get message class, by the expected type during the handshake or
+        # by the code at the start of the packet
+        if msg_type is None:
+            # A frame too short to hold a code is skipped like any other broken packet
+            if len(packet) < 4:
+                logger.warning('Packet too short for a message code: {}. Skipping.', bytes(packet))
                 return None
+            cls = self._resolve(_CODE.unpack_from(packet)[0])
+        else:
+            cls = Registry.MAPPING.get(msg_type)
+
+        if cls is None:
+            logger.opt(lazy=True).warning(
+                '{log}',
+                log=lambda: (
+                    f'Unknown message code: {bytes(packet[:4])}, size: {len(packet)}. Skipping.'
+                ),
+            )
+            return None
 
-        finally:
-            # Core principle: Regardless of parsing success, consume this data as long as length is sufficient
-            if len(self._buffer) >= total_packet_size:
-                del self._buffer[:total_packet_size]
+        try:
+            # 4. Perform deserialization
+            msg_obj = cls.unpack(packet)
+            logger.trace('Successfully parsed message: {}', msg_obj)
+            return msg_obj
+
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            logger.error('Failed to unpack message body (CODE: {}): {}', bytes(packet[:4]), e)
+            return None
+
+        except Exception as e:
+            logger.exception('Unexpected error during message construction: {}', e)
+            return None
+
+    def parse_all(self) -> list[T]:
+        """
+        Parse every complete packet in the buffer in one pass, sharing a single view of it.
+        Unknown or broken packets are skipped, an incomplete tail waits for the next feed.
+        """
+        messages = []
+        buffer = self._buffer
+        pos = self._read_pos
+        oversized = False
+
+        with memoryview(buffer) as view:
+            while len(buffer) - pos >= 4:
+                length = _LEN.unpack_from(buffer, pos)[0]
+                if length > _MAX_PACKET_SIZE:
+                    oversized = True
+                    break
+
+                end = pos + 4 + length
+                if end > len(buffer):
+                    break
+
+                with view[pos + 4 : end] as packet:
+                    msg_obj = self._unpack_packet(packet)
+                pos = end
+                if msg_obj is not None:
+                    messages.append(msg_obj)
+
+        if oversized:
+            # Protocol security check: the stream cannot be resynchronised after a bogus length
+            logger.error('Invalid packet length: {}, clearing buffer', length)
+            buffer.clear()
+            pos = 0
+        self._read_pos = pos
+        return messages
 
     def next_msg(self) -> T | None:
         """
         Try to parse and return a regular message object.
         """
-
-        def get_class(packet):
-            # Extract msg_code from packet and find corresponding message class
-            msg_code = struct.unpack_from('>4s', packet)[0]
-            return Registry.get_class(msg_code.decode())
-
-        return self._parse_packet(get_class)
+        return self._parse_packet()
 
     def next_handshake_msg(self, msg_type: Literal[MsgID.Hello, MsgID.HelloBack]) -> T | None:
         """
         Try to parse and return a Handshake message object.
         """
-
-        def get_class(_packet):
-            # Find message class directly by msg_type
-            return Registry.get_class(msg_type)
-
-        return self._parse_packet(get_class)
+        return self._parse_packet(msg_type)
@@ -23,6 +23,7 @@ DoubleComplex = Annotated[complex, 'D']
 SString = Annotated[str, 'p']
 String = Annotated[str, 's']
 VarString = Annotated[str, 'Is']
+VarBytes = Annotated[bytes, 'Is']
 
 
 class FixedString:
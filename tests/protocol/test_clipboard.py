@@ -0,0 +1,50 @@
+import pytest
+
+from packages.pynergy_protocol.src.pynergy_protocol import DClipboardMsg
+
+
+class TestDClipboardMsg:
+    @pytest.mark.parametrize(
+        'msg_raw, expected_identifier, expected_sequence, expected_flag, expected_data',
+        [
+            (
+                b'DCLP\x00\x00\x00\x00\x01\x00\x00\x00\x00\x0bHello World',
+                0,
+                1,
+                0,
+                b'Hello World',
+            ),
+            (b'DCLP\x01\x00\x00\x00\x02\x03\x00\x00\x00\x00', 1, 2, 3, b''),
+            (b'DCLP\x00\x00\x00\x00\x00\x01\x00\x00\x00\x03\xff\x00\xfe', 0, 0, 1, b'\xff\x00\xfe'),
+        ],
+    )
+    def test_pack_unpack(
+        self, msg_raw, expected_identifier, expected_sequence, expected_flag, expected_data
+    ):
+        """测试 bytes 数据的打包与解包"""
+        msg = DClipboardMsg(expected_identifier, expected_sequence, expected_flag, expected_data)
+        assert msg.pack() == msg_raw
+
+        msg = DClipboardMsg.unpack(msg_raw)
+        assert msg.identifier == expected_identifier
+        assert msg.sequence == expected_sequence
+        assert msg.flag == expected_flag
+        assert msg.data == expected_data
+        assert type(msg.data) is bytes
+
+    def test_data_str(self):
+        """测试 data_str 按 UTF-8 解码"""
+        msg = DClipboardMsg.unpack(DClipboardMsg(0, 0, 0, '你好'.encode()).pack())
+        assert msg.data_str == '你好'
+
+    def test_data_str_binary(self):
+        """测试非 UTF-8 数据仍可解包，只有 data_str 抛出 UnicodeDecodeError"""
+        msg = DClipboardMsg.unpack(DClipboardMsg(0, 0, 0, b'\xff\xfe').pack())
+        assert msg.data == b'\xff\xfe'
+        with pytest.raises(UnicodeDecodeError):
+            msg.data_str
+
+    def test_pack_str_data_rejected(self):
+        """data 只接受 bytes，传入 str 时打包失败"""
+        with pytest.raises(TypeError):
+            DClipboardMsg(0, 0, 0, 'text').pack()
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+
+import pytest
+
+from packages.pynergy_protocol.src.pynergy_protocol import (
+    DKeyDownMsg,
+    DKeyUpMsg,
+    FixedString,
+    Int16,
+    MsgBase,
+    UInt8,
+    UInt16,
+    UInt32,
+    VarBytes,
+    VarString,
+)
+from packages.pynergy_protocol.src.pynergy_protocol.core import _LAYOUT_CACHE
+
+
+@dataclass(slots=True)
+class FixedOnlyMsg(MsgBase):
+    a: UInt8
+    b: Int16
+    c: UInt32
+    tag: FixedString[4]
+
+
+@dataclass(slots=True)
+class VarStrMsg(MsgBase):
+    text: VarString
+
+
+@dataclass(slots=True)
+class VarBytesMsg(MsgBase):
+    data: VarBytes
+
+
+@dataclass(slots=True)
+class MixedMsg(MsgBase):
+    head: UInt16
+    name: VarString
+    flag: UInt8
+    tag: FixedString[3]
+    payload: VarBytes
+    tail: Int16
+
+
+class TestCodecRoundTrip:
+    @pytest.mark.parametrize(
+        'msg, expected_raw',
+        [
+            (FixedOnlyMsg(1, -2, 3, 'ab'), b'\x01\xff\xfe\x00\x00\x00\x03ab\x00\x00'),
+            (VarStrMsg('héllo'), b'\x00\x00\x00\x06h\xc3\xa9llo'),
+            (VarStrMsg(''), b'\x00\x00\x00\x00'),
+            (VarBytesMsg(b'\x00\xff\x10'), b'\x00\x00\x00\x03\x00\xff\x10'),
+            (
+                MixedMsg(7, 'ab', 1, 'xy', b'\x01', -1),
+                b'\x00\x07\x00\x00\x00\x02ab\x01xy\x00\x00\x00\x00\x01\x01\xff\xff',
+            ),
+        ],
+    )
+    def test_pack(self, msg, expected_raw):
+        """测试各种布局生成的 pack 函数"""
+        assert msg.pack() == expected_raw
+
+    @pytest.mark.parametrize(
+        'msg',
+        [
+            FixedOnlyMsg(255, -32768, 2**32 - 1, 'abcd'),
+            VarStrMsg('héllo'),
+            VarStrMsg(''),
+            VarBytesMsg(b'\x00\xff\x10'),
+            VarBytesMsg(b''),
+            MixedMsg(7, 'ab', 1, 'xy', b'\x01', -1),
+            MixedMsg(0, '', 0, '', b'', 0),
+        ],
+    )
+    def test_round_trip(self, msg):
+        """测试 pack 之后 unpack 得到相同的消息"""
+        result = type(msg).unpack(b'CODE' + msg.pack())
+        assert result == msg
+
+    def test_var_bytes_copied(self):
+        """VarBytes 字段解包为独立的 bytes，不引用原缓冲区"""
+        buffer = bytearray(b'CODE\x00\x00\x00\x02ab')
+        msg = VarBytesMsg.unpack(buffer)
+        buffer[-2:] = b'zz'
+        assert msg.data == b'ab'
+        assert type(msg.data) is bytes
+
+    @pytest.mark.parametrize(
+        'cls, msg_raw, match_text',
+        [
+            (FixedOnlyMsg, b'CODE\x01\x00', 'Insufficient data'),
+            (VarStrMsg, b'CODE\x00\x00', 'Insufficient data'),
+            (VarStrMsg, b'CODE\x00\x00\x00\x05abc', 'incomplete'),
+            (MixedMsg, b'CODE\x00\x07\x00\x00\x00\x02ab\x01', 'Insufficient data'),
+            (MixedMsg, b'CODE\x00\x07\x00\x00\x00\x02ab\x01xy\x00\x00\x00\x00\x09', 'incomplete'),
+        ],
+    )
+    def test_unpack_error(self, cls, msg_raw, match_text):
+        """测试数据不足时抛出 ValueError"""
+        with pytest.raises(ValueError, match=match_text):
+            cls.unpack(msg_raw)
+
+
+class TestLayoutCache:
+    def test_same_layout_shares_codecs(self):
+        """字段布局相同的消息共用一套编译结果"""
+        assert DKeyDownMsg._UNPACK_FIELDS is DKeyUpMsg._UNPACK_FIELDS
+        assert DKeyDownMsg._PACK_FIELDS is DKeyUpMsg._PACK_FIELDS
+        assert DKeyDownMsg._GROUPS is DKeyUpMsg._GROUPS
+
+    def test_new_class_reuses_cached_layout(self):
+        """新定义的类命中已有布局，不新增缓存项"""
+        size = len(_LAYOUT_CACHE)
+
+        @dataclass(slots=True)
+        class SameAsVarStrMsg(MsgBase):
+            other: VarString
+
+        assert len(_LAYOUT_CACHE) == size
+        assert SameAsVarStrMsg._UNPACK_FIELDS is VarStrMsg._UNPACK_FIELDS
+        assert SameAsVarStrMsg._FIELD_NAMES == ('other',)
+        assert SameAsVarStrMsg.unpack(b'CODE\x00\x00\x00\x01a') == SameAsVarStrMsg('a')
+
+    def test_different_layout_not_shared(self):
+        """布局不同的消息各自编译"""
+        assert FixedOnlyMsg._UNPACK_FIELDS is not MixedMsg._UNPACK_FIELDS
+        assert VarStrMsg._UNPACK_FIELDS is not VarBytesMsg._UNPACK_FIELDS
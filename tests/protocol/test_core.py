@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+from packages.pynergy_protocol.src.pynergy_protocol import (
+    DKeyDownLangMsg,
+    DKeyDownMsg,
+    MsgBase,
+    UInt16,
+)
+
+
+class TestMsgSubclass:
+    def test_subclass_of_registered_message(self):
+        """继承具体消息类时，CODE_IDX 等 ClassVar 不被当作字段"""
+
+        @dataclass(slots=True)
+        class MyKeyDownMsg(DKeyDownMsg):
+            pass
+
+        assert MyKeyDownMsg._FIELD_NAMES == ('key_id', 'mod_key_mask', 'key_button')
+        assert MyKeyDownMsg.CODE_IDX == DKeyDownMsg.CODE_IDX
+
+        msg = MyKeyDownMsg(0x61, 0, 0x1E)
+        assert msg.pack() == DKeyDownMsg(0x61, 0, 0x1E).pack()
+        assert MyKeyDownMsg.unpack(msg.pack()) == msg
+
+    def test_subclass_with_extra_field(self):
+        """子类追加的字段排在父类字段之后"""
+
+        @dataclass(slots=True)
+        class MyKeyDownLangMsg(DKeyDownLangMsg):
+            extra: UInt16 = 0
+
+        assert MyKeyDownLangMsg._FIELD_NAMES == (
+            'key_id',
+            'mod_key_mask',
+            'key_button',
+            'language_code',
+            'extra',
+        )
+        msg = MyKeyDownLangMsg(0x61, 0, 0x1E, 'en', 7)
+        assert MyKeyDownLangMsg.unpack(msg.pack()) == msg
+
+    def test_string_annotations(self):
+        """字符串形式的注解走 get_type_hints 路径"""
+
+        @dataclass(slots=True)
+        class StrAnnotatedMsg(MsgBase):
+            value: 'UInt16'
+
+        assert StrAnnotatedMsg._FIELD_NAMES == ('value',)
+        assert StrAnnotatedMsg(5).pack() == b'\x00\x05'
@@ -0,0 +1,57 @@
+import struct
+
+import pytest
+
+from packages.pynergy_protocol.src.pynergy_protocol import (
+    DKeyDownMsg,
+    DMouseMoveMsg,
+    PynergyParser,
+)
+
+
+def _frame(body: bytes) -> bytes:
+    """给消息体加上 4 字节长度前缀"""
+    return struct.pack('>I', len(body)) + body
+
+
+class TestShortPacket:
+    @pytest.mark.parametrize(
+        'broken',
+        [b'', b'D', b'DK', b'DKD'],
+    )
+    def test_next_msg_skips_short_packet(self, broken, propagate_logs):
+        """长度不足 4 字节的包被跳过，之后的消息照常解析"""
+        propagate_logs.set_level('WARNING')
+        msg = DKeyDownMsg(0x61, 0, 0x1E)
+        parser = PynergyParser()
+        parser.feed(_frame(broken) + msg.pack_for_socket())
+
+        assert parser.next_msg() is None
+        assert parser.next_msg() == msg
+        assert parser.next_msg() is None
+        assert 'Packet too short for a message code' in propagate_logs.text
+
+    @pytest.mark.parametrize(
+        'broken',
+        [b'', b'D', b'DK', b'DKD'],
+    )
+    def test_parse_all_skips_short_packet(self, broken):
+        """parse_all 跳过短包，不影响同一批中前后的消息"""
+        first = DMouseMoveMsg(10, 20)
+        second = DKeyDownMsg(0x61, 0, 0x1E)
+        parser = PynergyParser()
+        parser.feed(first.pack_for_socket() + _frame(broken) + second.pack_for_socket())
+
+        assert parser.parse_all() == [first, second]
+        assert parser.parse_all() == []
+
+    def test_short_packet_across_feeds(self):
+        """短包之后分段到达的消息仍能解析"""
+        msg = DKeyDownMsg(0x61, 0, 0x1E)
+        data = msg.pack_for_socket()
+        parser = PynergyParser()
+        parser.feed(_frame(b'') + data[:5])
+
+        assert parser.parse_all() == []
+        parser.feed(data[5:])
+        assert parser.parse_all() == [msg]
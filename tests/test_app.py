@@ -0,0 +1,62 @@
+"""
+命令行入口测试
+
+测试命令行参数与配置文件合并为 Config。
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+from pynergy_client.app import app
+from pynergy_client.config import VALID_FIELDS
+from typer.main import get_command
+from typer.testing import CliRunner
+
+
+def _run(tmp_path, *args, config=None):
+    """运行命令行入口，返回传给 run_app 的 Config"""
+    config_file = tmp_path / 'client-config.json'
+    if config is not None:
+        config_file.write_text(json.dumps(config), encoding='utf-8')
+    with patch('pynergy_client.app.run_app', new_callable=AsyncMock) as mock_run:
+        result = CliRunner().invoke(app, ['--config', str(config_file), *args])
+    assert result.exit_code == 0, result.output
+    mock_run.assert_called_once()
+    return mock_run.call_args[0][0]
+
+
+class TestCliOverrides:
+    """命令行参数覆盖配置文件"""
+
+    def test_every_option_is_a_config_field(self):
+        """除 config/version 和补全选项外的每个命令行参数都对应 Config 字段"""
+        names = {param.name for param in get_command(app).params}
+        assert names - VALID_FIELDS == {
+            'config',
+            'version',
+            'install_completion',
+            'show_completion',
+        }
+
+    def test_explicit_options_override_config_file(self, tmp_path):
+        """显式传入的参数优先于配置文件"""
+        cfg = _run(
+            tmp_path,
+            '--port',
+            '24801',
+            '--busy-poll',
+            '50',
+            '--log-level-stdout',
+            'DEBUG',
+            config={'port': 1234, 'server': 'example.org', 'busy_poll': 10},
+        )
+        assert cfg.port == 24801
+        assert cfg.busy_poll == 50
+        assert cfg.log_level_stdout == 'DEBUG'
+        assert cfg.server == 'example.org'
+
+    def test_defaults_do_not_override_config_file(self, tmp_path):
+        """未传入的参数不覆盖配置文件，未知字段被忽略"""
+        cfg = _run(tmp_path, config={'mouse_move_threshold': 4, 'unknown': 1})
+        assert cfg.mouse_move_threshold == 4
+        assert cfg.port == 24800
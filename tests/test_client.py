@@ -0,0 +1,142 @@
+"""
+客户端模块测试
+
+测试 PynergyClient 对已缓冲消息的分发。
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from pynergy_client.client.client import PynergyClient
+from pynergy_protocol import (
+    CCloseMsg,
+    DKeyDownMsg,
+    DKeyUpMsg,
+    DMouseMoveMsg,
+    DMouseRelMoveMsg,
+    PynergyParser,
+)
+
+
+def _make_client(*msgs):
+    """创建一个运行中的客户端，解析器中已缓冲 msgs"""
+    parser = PynergyParser()
+    parser.feed(b''.join(msg.pack_for_socket() for msg in msgs))
+    dispatcher = MagicMock()
+    dispatcher.dispatch = AsyncMock()
+    client = PynergyClient(MagicMock(), parser=parser, dispatcher=dispatcher)
+    client.running = True
+    return client
+
+
+def _dispatched(client):
+    return [c.args[0] for c in client.dispatcher.dispatch.call_args_list]
+
+
+class TestMoveCoalescing:
+    """连续的鼠标移动在分发前合并"""
+
+    def test_last_absolute_move_wins(self):
+        """连续的 DMMV 只分发最后一个位置"""
+        client = _make_client(DMouseMoveMsg(1, 1), DMouseMoveMsg(5, 6), DMouseMoveMsg(10, 20))
+        asyncio.run(client._dispatch_buffered())
+
+        assert _dispatched(client) == [DMouseMoveMsg(10, 20)]
+        client.dispatcher.flush.assert_called_once()
+
+    def test_relative_moves_summed(self):
+        """连续的 DMRM 位移相加"""
+        client = _make_client(
+            DMouseRelMoveMsg(1, -2), DMouseRelMoveMsg(3, 4), DMouseRelMoveMsg(-10, 0)
+        )
+        asyncio.run(client._dispatch_buffered())
+
+        assert _dispatched(client) == [DMouseRelMoveMsg(-6, 2)]
+
+    def test_other_message_flushes_pending_move(self):
+        """其他消息先分发挂起的移动，顺序不变"""
+        client = _make_client(
+            DMouseMoveMsg(1, 1),
+            DMouseMoveMsg(2, 2),
+            DKeyDownMsg(1, 0, 1),
+            DMouseRelMoveMsg(1, 1),
+            DMouseRelMoveMsg(2, 2),
+            DKeyUpMsg(1, 0, 1),
+            DMouseMoveMsg(3, 3),
+        )
+        asyncio.run(client._dispatch_buffered())
+
+        assert _dispatched(client) == [
+            DMouseMoveMsg(2, 2),
+            DKeyDownMsg(1, 0, 1),
+            DMouseRelMoveMsg(3, 3),
+            DKeyUpMsg(1, 0, 1),
+            DMouseMoveMsg(3, 3),
+        ]
+
+    def test_absolute_and_relative_not_merged(self):
+        """DMMV 与 DMRM 交替时不互相合并"""
+        client = _make_client(DMouseMoveMsg(1, 1), DMouseRelMoveMsg(2, 2), DMouseMoveMsg(3, 3))
+        asyncio.run(client._dispatch_buffered())
+
+        assert _dispatched(client) == [
+            DMouseMoveMsg(1, 1),
+            DMouseRelMoveMsg(2, 2),
+            DMouseMoveMsg(3, 3),
+        ]
+
+
+class TestStopWhileDispatching:
+    """处理函数在分发中途停止客户端"""
+
+    def test_rest_of_batch_dropped(self):
+        """CBYE 之后同一批的消息不再分发"""
+        bye = CCloseMsg()
+        client = _make_client(DKeyDownMsg(1, 0, 1), bye, DKeyDownMsg(2, 0, 2))
+
+        async def dispatch(msg, c):
+            if msg == bye:
+                await c.stop()
+
+        client.dispatcher.dispatch.side_effect = dispatch
+        asyncio.run(client._dispatch_buffered())
+
+        assert _dispatched(client) == [DKeyDownMsg(1, 0, 1), bye]
+        assert client.running is False
+        client.dispatcher.flush.assert_called_once()
+
+    def test_stop_does_not_cancel_current_task(self):
+        """在 listen_task 自身中调用 stop() 不会取消它"""
+        client = _make_client(CCloseMsg())
+
+        async def dispatch(msg, c):
+            await c.stop()
+
+        client.dispatcher.dispatch.side_effect = dispatch
+
+        async def main():
+            async def listen():
+                await client._dispatch_buffered()
+                return 'done'
+
+            client.listen_task = asyncio.create_task(listen())
+            return await client.listen_task
+
+        assert asyncio.run(main()) == 'done'
+        assert client.listen_task.cancelled() is False
+
+    def test_stop_cancels_other_task(self):
+        """从其他任务调用 stop() 仍会取消 listen_task"""
+        client = _make_client()
+
+        async def main():
+            client.listen_task = asyncio.create_task(asyncio.sleep(10))
+            await asyncio.sleep(0)
+            await client.stop()
+            try:
+                await client.listen_task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(main())
+        assert client.listen_task.cancelled() is True
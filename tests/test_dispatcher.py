@@ -0,0 +1,222 @@
+"""
+消息分发模块测试
+
+测试 @handles 收集的处理函数表和按客户端状态过滤输入事件。
+"""
+
+import asyncio
+import struct
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from evdev import ecodes
+from pynergy_client.client.client import PynergyClient
+from pynergy_client.client.dispatcher import MessageDispatcher
+from pynergy_client.client.handlers import PynergyHandler, handles
+from pynergy_client.client.protocols import ClientState
+from pynergy_client.device import UInputKeyboardDevice, UInputMouseDevice
+from pynergy_protocol import (
+    CEnterMsg,
+    DKeyDownMsg,
+    DKeyUpMsg,
+    DMouseDownMsg,
+    DMouseMoveMsg,
+    DMouseRelMoveMsg,
+    DMouseUpMsg,
+    MsgID,
+    PynergyParser,
+)
+
+
+def _make_handler(cls=PynergyHandler, mouse=None, keyboard=None, threshold=0):
+    cfg = SimpleNamespace(
+        mouse_move_threshold=threshold, mouse_pos_sync_freq=1, abs_mouse_move=True
+    )
+    return cls(cfg, MagicMock(), mouse or MagicMock(), keyboard or MagicMock())
+
+
+def _make_client(state=ClientState.ACTIVE):
+    client = MagicMock()
+    client.state = state
+    return client
+
+
+class OverrideHandler(PynergyHandler):
+    __slots__ = ('seen',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.seen = []
+
+    # 覆盖父类的 on_dkdn
+    @handles(MsgID.DKDN)
+    async def on_dkdn(self, msg, client):
+        self.seen.append(('on_dkdn', msg))
+
+    # 以新名字接管 DKUP，父类的 on_dkup 不再生效
+    @handles(MsgID.DKUP)
+    async def on_key_release(self, msg, client):
+        self.seen.append(('on_key_release', msg))
+
+    # 未标记的覆盖会遮蔽父类方法，DMRM 回落到默认处理函数
+    async def on_dmrm(self, msg, client):
+        self.seen.append(('on_dmrm', msg))
+
+
+class TestHandlerTable:
+    """处理函数表的构建"""
+
+    def test_every_code_has_entry(self):
+        """处理函数表按 CODE_IDX 覆盖所有消息类型"""
+        dispatcher = MessageDispatcher(_make_handler())
+        assert len(dispatcher._handler_table) == len(MsgID)
+
+    def test_marked_methods_loaded(self):
+        """@handles 标记的方法按 CODE_IDX 放入表中"""
+        handler = _make_handler()
+        dispatcher = MessageDispatcher(handler)
+
+        assert dispatcher._handler_table[DKeyDownMsg.CODE_IDX] == handler.on_dkdn
+        assert dispatcher._handler_table[CEnterMsg.CODE_IDX] == handler.on_cinn
+
+    def test_subclass_override(self):
+        """子类覆盖的方法优先于父类"""
+        handler = _make_handler(OverrideHandler)
+        dispatcher = MessageDispatcher(handler)
+        client = _make_client()
+
+        asyncio.run(dispatcher.dispatch(DKeyDownMsg(1, 0, 1), client))
+        asyncio.run(dispatcher.dispatch(DKeyUpMsg(1, 0, 1), client))
+
+        assert handler.seen == [
+            ('on_dkdn', DKeyDownMsg(1, 0, 1)),
+            ('on_key_release', DKeyUpMsg(1, 0, 1)),
+        ]
+        handler.keyboard.send_key.assert_not_called()
+
+    def test_subclass_inherits_handlers(self):
+        """子类未覆盖的处理函数沿用父类"""
+        handler = _make_handler(OverrideHandler)
+        dispatcher = MessageDispatcher(handler)
+
+        assert dispatcher._handler_table[CEnterMsg.CODE_IDX] == handler.on_cinn
+        assert dispatcher._handler_table[DMouseMoveMsg.CODE_IDX] == handler.on_dmmv
+
+    def test_unknown_code_uses_default_handler(self, propagate_logs):
+        """没有处理函数的消息交给 default_handler"""
+        propagate_logs.set_level('WARNING')
+        handler = _make_handler(OverrideHandler)
+        dispatcher = MessageDispatcher(handler)
+        assert dispatcher._handler_table[DMouseRelMoveMsg.CODE_IDX] == handler.default_handler
+
+        asyncio.run(dispatcher.dispatch(DMouseRelMoveMsg(1, 1), _make_client()))
+
+        assert 'Ignored message' in propagate_logs.text
+        assert 'DMRM' in propagate_logs.text
+        assert handler.seen == []
+        handler.mouse.move_relative.assert_not_called()
+
+
+class TestDeviceGating:
+    """输入事件只在 ACTIVE 状态下注入"""
+
+    def test_device_message_ignored_when_not_active(self, propagate_logs):
+        """非 ACTIVE 状态下丢弃 DEVICE_CODES 中的消息"""
+        propagate_logs.set_level('WARNING')
+        handler = _make_handler()
+        dispatcher = MessageDispatcher(handler)
+
+        for state in (ClientState.CONNECTED, ClientState.INACTIVE):
+            asyncio.run(dispatcher.dispatch(DKeyDownMsg(1, 0, 1), _make_client(state)))
+            asyncio.run(dispatcher.dispatch(DMouseRelMoveMsg(1, 1), _make_client(state)))
+
+        handler.keyboard.send_key.assert_not_called()
+        handler.mouse.move_relative.assert_not_called()
+        assert 'Ignored' in propagate_logs.text
+
+        dispatcher.flush()
+        handler.mouse.syn.assert_not_called()
+
+    def test_device_message_handled_when_active(self):
+        """ACTIVE 状态下正常处理，并在 flush 时发送 SYN"""
+        handler = _make_handler()
+        dispatcher = MessageDispatcher(handler)
+
+        asyncio.run(dispatcher.dispatch(DKeyDownMsg(1, 0, 1), _make_client()))
+        handler.keyboard.send_key.assert_called_once()
+
+        dispatcher.flush()
+        handler.keyboard.syn.assert_called_once()
+        handler.mouse.syn.assert_called_once()
+
+    def test_absolute_move_not_gated(self):
+        """DMMV 不受客户端状态限制"""
+        handler = _make_handler()
+        dispatcher = MessageDispatcher(handler)
+
+        asyncio.run(dispatcher.dispatch(DMouseMoveMsg(10, 20), _make_client(ClientState.CONNECTED)))
+        handler.mouse.move_absolute.assert_called_once_with(10, 20)
+
+
+SYN = (ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
+
+
+class TestFrames:
+    """每条消息单独成帧，一批消息共用一次写入"""
+
+    def _run_batch(self, *msgs):
+        """用真实的 uinput 设备分发一批消息，返回鼠标写入的 (type, code, value) 列表"""
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
+            handler = _make_handler(mouse=UInputMouseDevice(), keyboard=UInputKeyboardDevice())
+            parser = PynergyParser()
+            parser.feed(b''.join(msg.pack_for_socket() for msg in msgs))
+            client = PynergyClient(
+                MagicMock(), parser=parser, dispatcher=MessageDispatcher(handler)
+            )
+            client.running = True
+            client.state = ClientState.ACTIVE
+            asyncio.run(client._dispatch_buffered())
+
+        mock_write.assert_called_once()
+        return [ev[2:] for ev in struct.iter_unpack('llHHi', mock_write.call_args[0][1])]
+
+    def test_move_and_click_in_separate_frames(self):
+        """同一批中的 DMMV 与 DMDN 写成两个以 SYN 结尾的帧"""
+        assert self._run_batch(DMouseMoveMsg(10, 20), DMouseDownMsg(1)) == [
+            (ecodes.EV_ABS, ecodes.ABS_X, 10),
+            (ecodes.EV_ABS, ecodes.ABS_Y, 20),
+            SYN,
+            (ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+            SYN,
+        ]
+
+    def test_press_and_release_in_separate_frames(self):
+        """快速点击的按下与释放不会合并到同一帧"""
+        assert self._run_batch(DMouseDownMsg(1), DMouseUpMsg(1)) == [
+            (ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+            SYN,
+            (ecodes.EV_KEY, ecodes.BTN_LEFT, 0),
+            SYN,
+        ]
+
+
+class TestMoveThrottle:
+    """mouse_move_threshold 限制绝对移动的频率"""
+
+    def test_move_inside_interval_dropped(self):
+        """间隔内的第二个 DMMV 被丢弃，超过间隔后恢复"""
+        handler = _make_handler(threshold=8)
+        client = _make_client()
+        ms = 1_000_000
+
+        with patch('pynergy_client.client.handlers.monotonic_ns') as mock_now:
+            for now, msg in (
+                (100 * ms, DMouseMoveMsg(1, 1)),
+                (104 * ms, DMouseMoveMsg(2, 2)),
+                (108 * ms, DMouseMoveMsg(3, 3)),
+                (110 * ms, DMouseMoveMsg(4, 4)),
+            ):
+                mock_now.return_value = now
+                asyncio.run(handler.on_dmmv(msg, client))
+
+        assert handler.mouse.move_absolute.call_args_list == [((1, 1),), ((3, 3),)]
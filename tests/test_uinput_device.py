@@ -4,10 +4,22 @@
 测试 VirtualDevice 类的功能。
 """
 
+import struct
 from unittest.mock import MagicMock, patch
 
 from evdev import ecodes
 from pynergy_client.device import UInputKeyboardDevice, UInputMouseDevice
+from pynergy_client.device.backends import vdev_uinput
+from pynergy_client.keymaps.ecode_map import ECODE_TO_HID
+
+
+def _written_events(mock_write):
+    """解析 os.write 最后一次写入的 input_event，返回 (type, code, value) 列表"""
+    data = mock_write.call_args[0][1]
+    return [ev[2:] for ev in struct.iter_unpack('llHHi', data)]
+
+
+SYN = (ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
 
 
 class TestUIputDeviceCreation:
@@ -98,8 +110,13 @@ class TestUIputDeviceCreation:
             capabilities = call_kwargs['events']
             assert ecodes.EV_KEY in capabilities
             key_events = capabilities[ecodes.EV_KEY]
-            for code in range(1, 256):
-                assert code in key_events
+            for code in ECODE_TO_HID:
+                if code < ecodes.BTN_MISC:
+                    assert code in key_events
+            assert ecodes.KEY_CAPSLOCK in key_events
+            assert ecodes.KEY_NUMLOCK in key_events
+            assert ecodes.KEY_SCROLLLOCK in key_events
+            assert ecodes.BTN_LEFT not in key_events
 
 
 class TestMouseEvents:
@@ -107,40 +124,66 @@ class TestMouseEvents:
 
     def test_write_mouse_move(self):
         """测试鼠标移动事件写入"""
-        with patch('evdev.UInput') as mock_ui:
+        with patch('evdev.UInput') as mock_ui, patch('os.write') as mock_write:
             mock_instance = MagicMock()
             mock_ui.return_value = mock_instance
             device = UInputMouseDevice()
             device.move_relative(10, 20)
-            mock_instance.write.assert_any_call(ecodes.EV_REL, ecodes.REL_X, 10)
-            mock_instance.write.assert_any_call(ecodes.EV_REL, ecodes.REL_Y, 20)
+            mock_write.assert_not_called()
+            device.syn()
+            mock_write.assert_called_once()
+            assert _written_events(mock_write) == [
+                (ecodes.EV_REL, ecodes.REL_X, 10),
+                (ecodes.EV_REL, ecodes.REL_Y, 20),
+                SYN,
+            ]
+
+    def test_move_absolute_single_write(self):
+        """测试绝对移动的两个坐标轴合并为一次写入"""
+        with patch('evdev.UInput') as mock_ui, patch('os.write') as mock_write:
+            mock_instance = MagicMock()
+            mock_ui.return_value = mock_instance
+            device = UInputMouseDevice()
+            device.move_absolute(100, 200)
+            device.syn()
+            mock_write.assert_called_once()
+            assert mock_write.call_args[0][0] is mock_instance.fd
+            assert _written_events(mock_write) == [
+                (ecodes.EV_ABS, ecodes.ABS_X, 100),
+                (ecodes.EV_ABS, ecodes.ABS_Y, 200),
+                SYN,
+            ]
+            mock_instance.write.assert_not_called()
+            mock_instance.syn.assert_not_called()
 
     def test_write_wheel_vertical(self):
         """测试垂直滚轮事件写入"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputMouseDevice()
             device.wheel_relative(dy=1)
-            mock_instance.write.assert_called_with(ecodes.EV_REL, ecodes.REL_WHEEL, 1)
+            device.syn()
+            assert _written_events(mock_write) == [(ecodes.EV_REL, ecodes.REL_WHEEL, 1), SYN]
 
     def test_write_wheel_horizontal(self):
         """测试水平滚轮事件写入"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputMouseDevice()
             device.wheel_relative(dx=-1)
-            mock_instance.write.assert_called_with(ecodes.EV_REL, ecodes.REL_HWHEEL, -1)
+            device.syn()
+            assert _written_events(mock_write) == [(ecodes.EV_REL, ecodes.REL_HWHEEL, -1), SYN]
 
     def test_write_wheel_both(self):
         """测试双向滚轮事件写入"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputMouseDevice()
             device.wheel_relative(dx=1, dy=-1)
-            assert mock_instance.write.call_count == 2
+            device.syn()
+            mock_write.assert_called_once()
+            assert _written_events(mock_write) == [
+                (ecodes.EV_REL, ecodes.REL_WHEEL, -1),
+                (ecodes.EV_REL, ecodes.REL_HWHEEL, 1),
+                SYN,
+            ]
 
 
 class TestKeyEvents:
@@ -148,42 +191,82 @@ class TestKeyEvents:
 
     def test_key_press(self):
         """测试按键按下事件"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputKeyboardDevice()
             device.send_key(30, down=True)  # KEY_A = 30
-            mock_instance.write.assert_called_with(ecodes.EV_KEY, 30, 1)
+            device.syn()
+            assert _written_events(mock_write) == [(ecodes.EV_KEY, 30, 1), SYN]
 
     def test_key_release(self):
         """测试按键释放事件"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputKeyboardDevice()
             device.pressed_keys.add(30)
             device.send_key(30, down=False)  # KEY_A = 30
-            mock_instance.write.assert_called_with(ecodes.EV_KEY, 30, 0)
+            device.syn()
+            assert _written_events(mock_write) == [(ecodes.EV_KEY, 30, 0), SYN]
 
 
 class TestSync:
     """同步测试"""
 
-    def test_syn_calls_syn(self):
-        """测试同步方法调用"""
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+    def test_syn_writes_frame_once(self):
+        """测试同步时将整帧事件与 SYN_REPORT 一次写入"""
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputMouseDevice()
+            device.move_relative(1, 1)
+            device.send_button(ecodes.BTN_LEFT, True)
             device.syn()
-            mock_instance.syn.assert_called_once()
-
-        with patch('evdev.UInput') as mock_ui:
-            mock_instance = MagicMock()
-            mock_ui.return_value = mock_instance
+            mock_write.assert_called_once()
+            assert _written_events(mock_write) == [
+                (ecodes.EV_REL, ecodes.REL_X, 1),
+                (ecodes.EV_REL, ecodes.REL_Y, 1),
+                (ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+                SYN,
+            ]
+
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
             device = UInputKeyboardDevice()
+            device.send_key(30, down=True)
+            device.send_key(30, down=False)
+            device.syn()
+            mock_write.assert_called_once()
+            assert _written_events(mock_write) == [
+                (ecodes.EV_KEY, 30, 1),
+                (ecodes.EV_KEY, 30, 0),
+                SYN,
+            ]
+
+    def test_marked_frames_written_once(self):
+        """测试 mark 分隔的多帧事件在 syn 时一次写入"""
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
+            device = UInputMouseDevice()
+            device.mark()
+            device.move_absolute(10, 20)
+            device.mark()
+            device.mark()
+            device.send_button(ecodes.BTN_LEFT, True)
+            device.mark()
+            mock_write.assert_not_called()
+            device.syn()
+            mock_write.assert_called_once()
+            assert _written_events(mock_write) == [
+                (ecodes.EV_ABS, ecodes.ABS_X, 10),
+                (ecodes.EV_ABS, ecodes.ABS_Y, 20),
+                SYN,
+                (ecodes.EV_KEY, ecodes.BTN_LEFT, 1),
+                SYN,
+            ]
+
+    def test_syn_skipped_without_events(self):
+        """测试没有写入事件时不发送同步"""
+        with patch('evdev.UInput'), patch('os.write') as mock_write:
+            device = UInputMouseDevice()
             device.syn()
-            mock_instance.syn.assert_called_once()
+            device.move_relative(1, 1)
+            device.syn()
+            device.syn()
+            mock_write.assert_called_once()
 
 
 class TestClose:
@@ -205,6 +288,24 @@ class TestClose:
             device.close()
             mock_instance.close.assert_called_once()
 
+    def test_keyboard_close_releases_led_fds(self):
+        """测试关闭键盘时关闭并清空缓存的 LED 文件描述符"""
+        with (
+            patch('evdev.UInput'),
+            patch('os.write'),
+            patch('glob.glob', return_value=['/sys/class/leds/input3::capslock/brightness']),
+            patch('os.open', return_value=42),
+            patch('os.pread', return_value=b'0\n'),
+            patch('os.close') as mock_close,
+        ):
+            device = UInputKeyboardDevice()
+            device.sync_modifiers(1)
+            assert vdev_uinput._LED_FDS
+            device.close()
+            assert vdev_uinput._LED_FDS == {}
+            assert mock_close.call_count == len(vdev_uinput._LOCK_KEYS)
+            mock_close.assert_called_with(42)
+
 
 class TestContextManager:
     """上下文管理器测试"""